@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Import-time breakdown of the app module and of the optional storage providers.
+
+Runs `python -X importtime` in a fresh interpreter per target and prints the total import time
+and the slowest top-level imports, e.g.
+
+    PYTHONPATH=src python benchmarks/import_time.py --top 10
+
+The app is imported in oauth mode with the memory provider, which is what test runs and a
+memory-backed pod pay at startup; the vault and postgres rows show what selecting those
+providers adds on top of it.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent / "src" / "jitsi_slack_bolt"
+
+BASE_ENV = {
+    "SLACK_EVENTS_API_MODE": "oauth",
+    "SLACK_SIGNING_SECRET": "benchmark",
+    "SLACK_CLIENT_ID": "benchmark",
+    "SLACK_CLIENT_SECRET": "benchmark",
+    "STORAGE_PROVIDER": "memory",
+}
+
+
+TARGETS = {
+    "app (memory provider)": "import app",
+    "vault provider": "import jitsi_slack_bolt.util.vault",
+    "postgres provider": "import jitsi_slack_bolt.util.postgres",
+}
+
+
+def measure(statement="import app"):
+    """Run `statement` in a fresh interpreter and return (rows, raw importtime output).
+
+    Each row is (module, self_us, cumulative_us, depth).
+    """
+    env = {**os.environ, **BASE_ENV}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(APP_DIR.parent), env.get("PYTHONPATH")]))
+    with tempfile.TemporaryDirectory() as metrics_dir:
+        env["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement],
+            cwd=APP_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows, proc.stderr
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--top", type=int, default=10, help="number of top-level imports to show")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per configuration")
+    args = parser.parse_args()
+
+    for label, statement in TARGETS.items():
+        runs = [measure(statement)[0] for _ in range(args.repeat)]
+        best = min(runs, key=lambda rows: sum(r[1] for r in rows))
+        total_ms = sum(r[1] for r in best) / 1000
+        print(f"\n{label}: {total_ms:.1f} ms total, {len(best)} modules")
+        top_level = sorted((r for r in best if r[3] == 1), key=lambda r: -r[2])
+        for name, _, cumulative_us, _ in top_level[: args.top]:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
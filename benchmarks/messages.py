@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Allocation counts and per-message latency of the Block Kit message builders.
+
+Compares the template-backed builders in util/messages.py against rebuilding every node of the
+message on each call, which is what the previous f-string builders did, e.g.
+
+    PYTHONPATH=src python benchmarks/messages.py
+"""
+
+import argparse
+import json
+import timeit
+import tracemalloc
+
+from jitsi_slack_bolt.util.messages import (
+    HELP_MESSAGE_TEMPLATE,
+    JOIN_MESSAGE_TEMPLATE,
+    build_help_message_blocks,
+    build_join_message_blocks,
+)
+from jitsi_slack_bolt.util.templates import Slot
+
+MESSAGE = "A Jitsi meeting has started at https://meet.jit.si/"
+ROOM_URL = "https://meet.jit.si/LengthySymbolsSendUpstairs"
+
+
+def legacy_join_message_blocks(message, room_url):
+    """The join message builder as it was before templates."""
+    return [
+        {"type": "section", "text": {"type": "plain_text", "text": f"{message}"}},
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "Click to Join"},
+                    "style": "primary",
+                    "url": f"{room_url}",
+                    "action_id": "join_button",
+                }
+            ],
+        },
+    ]
+
+
+def rebuild(node, values):
+    """Build a fresh copy of every node of a template tree, as the f-string builders did."""
+    if isinstance(node, Slot):
+        return node.fmt.format(values[node.name])
+    if isinstance(node, dict):
+        return {key: rebuild(child, values) for key, child in node.items()}
+    if isinstance(node, list):
+        return [rebuild(child, values) for child in node]
+    return node
+
+
+def allocations(fn, calls=100):
+    """Average number of memory blocks allocated per call, as seen by tracemalloc."""
+    results = []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(calls):
+        results.append(fn())
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    return blocks / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    args = parser.parse_args()
+
+    help_values = {"slash_cmd": "/jitsi", "default_server_url": "https://meet.jit.si/"}
+
+    cases = {
+        "join: previous builder": lambda: legacy_join_message_blocks(MESSAGE, ROOM_URL),
+        "join: template render": lambda: build_join_message_blocks(MESSAGE, ROOM_URL),
+        "join: template render_json": lambda: JOIN_MESSAGE_TEMPLATE.render_json(
+            message=MESSAGE, room_url=ROOM_URL
+        ),
+        "join: previous builder + json.dumps": lambda: json.dumps(
+            legacy_join_message_blocks(MESSAGE, ROOM_URL)
+        ),
+        "help: rebuild every node": lambda: rebuild(HELP_MESSAGE_TEMPLATE.blocks, help_values),
+        "help: template render (uncached)": lambda: build_help_message_blocks.__wrapped__(
+            "/jitsi", "https://meet.jit.si/"
+        ),
+        "help: memoized": lambda: build_help_message_blocks("/jitsi", "https://meet.jit.si/"),
+    }
+
+    print(f"{'ns/msg':>8}  {'allocs':>6}  case")
+    for label, fn in cases.items():
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        print(f"{best / args.number * 1e9:8.0f}  {allocations(fn):6.1f}  {label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Scrape time of the Prometheus multiprocess directory before and after compaction.
+
+Simulates a server that has recycled `--workers` workers, each leaving counter and histogram
+files behind, e.g.
+
+    PYTHONPATH=src python benchmarks/metrics_scrape.py --workers 500
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+from jitsi_slack_bolt.util.multiprocess import CompactingMultiProcessCollector, compact
+
+BUCKETS = ["0.005", "0.01", "0.025", "0.05", "0.1", "0.25", "0.5", "1.0", "2.5", "5.0", "+Inf"]
+ENDPOINTS = ["/slack/events", "/slack/install", "/slack/oauth_redirect"]
+
+
+def write_worker(path, pid):
+    """Write the files one recycled worker leaves behind."""
+    counter = MmapedDict(os.path.join(path, f"counter_{pid}.db"))
+    histogram = MmapedDict(os.path.join(path, f"histogram_{pid}.db"))
+    for endpoint in ENDPOINTS:
+        labels = ["method", "path", "status"], ["POST", endpoint, "200"]
+        counter.write_value(
+            mmap_key("flask_http_request", "flask_http_request_total", *labels, "Requests"), 10, 0
+        )
+        for le in BUCKETS:
+            histogram.write_value(
+                mmap_key(
+                    "flask_http_request_duration_seconds",
+                    "flask_http_request_duration_seconds_bucket",
+                    labels[0] + ["le"],
+                    labels[1] + [le],
+                    "Latency",
+                ),
+                1,
+                0,
+            )
+    counter.close()
+    histogram.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=500, help="exited workers to simulate")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        pids = range(1000, 1000 + args.workers)
+        for pid in pids:
+            write_worker(path, pid)
+        collector = CompactingMultiProcessCollector(None, path=path)
+
+        def scrape():
+            return list(collector.collect())
+
+        files = len(os.listdir(path))
+        before = min(timeit.repeat(scrape, number=1, repeat=args.repeat))
+        compacted = timeit.timeit(lambda: compact(path, pids), number=1)
+        after = min(timeit.repeat(scrape, number=1, repeat=args.repeat))
+
+        print(f"{files:6d} files: scrape {before * 1e3:8.2f} ms")
+        print(f"{'':6s}        compaction {compacted * 1e3:8.2f} ms (once per interval)")
+        print(f"{len(os.listdir(path)):6d} files: scrape {after * 1e3:8.2f} ms after compaction")
+
+
+if __name__ == "__main__":
+    main()
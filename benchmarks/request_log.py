@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Per-request logging overhead at INFO and DEBUG.
+
+Compares the previous eager `logger.debug(body)` / f-string logging with RequestLogger, writing
+to a handler that discards output directly or through the queued handler, e.g.
+
+    PYTHONPATH=src python benchmarks/request_log.py
+"""
+
+import argparse
+import io
+import logging
+import timeit
+
+from jitsi_slack_bolt.util.request_log import RequestLogger, start_queued_logging
+
+BODY = {
+    "token": "gIkuvaNzQIHg97ATvDxqgjtO",
+    "team_id": "T0001",
+    "team_domain": "example",
+    "channel_id": "C2147483705",
+    "channel_name": "test",
+    "user_id": "U2147483697",
+    "user_name": "Steve",
+    "command": "/jitsi",
+    "text": "@alice @bob",
+    "response_url": "https://hooks.slack.com/commands/1234/5678",
+    "trigger_id": "13345224609.738474920.8088930838d88f008e0",
+}
+
+
+def make_logger(level, queued):
+    logger = logging.getLogger(f"bench-{logging.getLevelName(level)}-{queued}")
+    logger.handlers.clear()
+    logger.propagate = False
+    logger.setLevel(level)
+    logger.addHandler(logging.StreamHandler(io.StringIO()))
+    listener = start_queued_logging(logger) if queued else None
+    return logger, listener
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="requests per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="rate for the sampled case")
+    args = parser.parse_args()
+
+    print(f"{'ns/req':>8}  case")
+    for level in (logging.INFO, logging.DEBUG):
+        for queued in (False, True):
+            logger, listener = make_logger(level, queued)
+            request_log = RequestLogger(logger)
+            sampled_log = RequestLogger(logger, default_rate=args.sample_rate)
+            handler = "queued handler" if queued else "direct handler"
+            cases = {
+                "previous: logger.debug(body)": lambda: logger.debug(BODY),
+                "previous: logger.debug(f'received event {body}')": lambda: logger.debug(
+                    f"received event {BODY}"
+                ),
+                "RequestLogger.log": lambda: request_log.log("bolt", "received", payload=BODY),
+                f"RequestLogger.log sampled at {args.sample_rate}": lambda: sampled_log.log(
+                    "bolt", "received", payload=BODY
+                ),
+            }
+            for label, fn in cases.items():
+                best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+                print(
+                    f"{best / args.number * 1e9:8.0f}  "
+                    f"{logging.getLevelName(level)}, {handler}: {label}"
+                )
+            if listener is not None:
+                listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Per-name cost and memory footprint of the room name generator.
+
+Compares the packed WordList generator against the previous implementation (four Python lists
+and four random.choice calls per name), e.g.
+
+    PYTHONPATH=src python benchmarks/room_name.py --batch 1000
+"""
+
+import argparse
+import random
+import timeit
+import tracemalloc
+
+from jitsi_slack_bolt.util import room_name
+from jitsi_slack_bolt.util.room_name import WordList, generate_room_name, generate_room_names
+
+
+def allocated_bytes(build):
+    """Bytes still allocated after `build()` returns, as seen by tracemalloc."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()  # noqa: F841 - keep the result alive while measuring
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch", type=int, default=1000, help="names per batch call")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    args = parser.parse_args()
+
+    word_lists = [list(part) for part in room_name._PARTS]
+    # copy every word so the list baseline does not share string objects with the WordLists
+    fresh_lists = [[(w + ".")[:-1] for w in words] for words in word_lists]
+
+    def list_generate():
+        adjectives, nouns, verbs, adverbs = fresh_lists
+        return (
+            random.choice(adjectives)
+            + random.choice(nouns)
+            + random.choice(verbs)
+            + random.choice(adverbs)
+        )
+
+    cases = {
+        "list + random.choice (previous)": (list_generate, 1),
+        "generate_room_name()": (generate_room_name, 1),
+        f"generate_room_names({args.batch})": (lambda: generate_room_names(args.batch), args.batch),
+    }
+
+    print("per-name cost")
+    for label, (fn, names_per_call) in cases.items():
+        calls = max(1, 20000 // names_per_call)
+        best = min(timeit.repeat(fn, number=calls, repeat=args.repeat))
+        print(f"  {best / (calls * names_per_call) * 1e9:8.0f} ns  {label}")
+
+    words = [w for words in word_lists for w in words]
+    print(f"\nmemory footprint of {len(words)} words")
+    list_bytes = allocated_bytes(lambda: [[(w + ".")[:-1] for w in ws] for ws in word_lists])
+    packed_bytes = allocated_bytes(lambda: [WordList(ws) for ws in word_lists])
+    print(f"  {list_bytes:8d} bytes  Python lists of str")
+    print(f"  {packed_bytes:8d} bytes  WordList")
+
+
+if __name__ == "__main__":
+    main()
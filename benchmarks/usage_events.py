@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Per-room cost of recording a usage event.
+
+Compares writing each event synchronously to the JSON lines sink with queueing it for the
+background writer, e.g.
+
+    PYTHONPATH=src python benchmarks/usage_events.py
+"""
+
+import argparse
+import os
+import tempfile
+import timeit
+
+from jitsi_slack_bolt.util.usage import (
+    FileUsageSink,
+    UsageEvent,
+    UsageRecorder,
+    record_usage,
+    set_usage_recorder,
+)
+
+EVENT = UsageEvent("T0001", "C2147483705", "room", "https://meet.jit.si/", 1700000000.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=20000, help="events per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = FileUsageSink(os.path.join(tmp, "usage.jsonl"))
+        recorder = UsageRecorder(sink, max_queue_size=args.number * args.repeat * 2)
+        set_usage_recorder(recorder)
+        cases = {
+            "synchronous write per event": lambda: sink.write([EVENT]),
+            "record_usage (queued)": lambda: record_usage(
+                "T0001", "C2147483705", "room", "https://meet.jit.si/"
+            ),
+        }
+
+        print(f"{'ns/event':>9}  case")
+        for label, fn in cases.items():
+            best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+            print(f"{best / args.number * 1e9:9.0f}  {label}")
+        recorder.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Authenticated admin endpoints for diagnosing a live worker.
+
+The blueprint is registered on the Flask app in oauth mode and served by a small sidecar
+server in socket mode. Every request must carry `Authorization: Bearer <ADMIN_TOKEN>`; without
+a token configured the endpoints are not installed at all.
+
+  POST /admin/profile?seconds=10&interval=0.005 : sample the worker's stacks in the background
+  GET  /admin/profile?pid=<pid>                  : latest finished profile in collapsed format
+  POST /admin/heap/start?frames=1                : start tracing allocations
+  GET  /admin/heap?top=25                        : allocation growth since the last snapshot
+  POST /admin/heap/stop                          : stop tracing allocations
+  GET  /admin/slow                               : requests recorded by the slow request watchdog
+
+Each request is served by a single worker, whose pid is returned in the X-Worker-Pid header.
+Profiles are shared through a directory, so any worker can return them; heap snapshots and slow
+requests are per worker.
+"""
+
+import hmac
+import logging
+import os
+import threading
+
+from flask import Blueprint, Flask, Response, abort, jsonify, request
+from werkzeug.serving import make_server
+
+from jitsi_slack_bolt.util.profiling import (
+    HeapTracker,
+    ProfilerBusy,
+    StackSampler,
+    format_collapsed,
+)
+from jitsi_slack_bolt.util.watchdog import get_watchdog
+
+logger = logging.getLogger(__name__)
+
+
+def _number(name: str, default: float, cast=float):
+    try:
+        return cast(request.args.get(name, default))
+    except ValueError:
+        abort(400, f"{name} must be a number")
+
+
+def create_admin_blueprint(token: str, profile_dir: str) -> Blueprint:
+    """Build the admin blueprint, authenticating requests against `token`.
+
+    Finished CPU profiles are written to `profile_dir`, which all workers must share.
+    """
+    if not token:
+        raise ValueError("an admin token is required")
+    admin = Blueprint("admin", __name__, url_prefix="/admin")
+    sampler = StackSampler(profile_dir)
+    heap = HeapTracker()
+    expected = f"Bearer {token}".encode()
+
+    @admin.before_request
+    def authenticate():
+        supplied = request.headers.get("Authorization", "").encode()
+        if not hmac.compare_digest(supplied, expected):
+            abort(401)
+
+    @admin.after_request
+    def add_worker_pid(response):
+        response.headers["X-Worker-Pid"] = str(os.getpid())
+        return response
+
+    @admin.route("/profile", methods=["POST"])
+    def profile_start():
+        seconds = _number("seconds", 10.0)
+        interval = _number("interval", 0.005)
+        if interval <= 0:
+            abort(400, "interval must be positive")
+        try:
+            seconds = sampler.start(seconds, interval)
+        except ProfilerBusy as e:
+            abort(409, str(e))
+        logger.info(f"profiling worker {os.getpid()} for {seconds}s")
+        return jsonify({"pid": os.getpid(), "seconds": seconds}), 202
+
+    @admin.route("/profile", methods=["GET"])
+    def profile_result():
+        pid = request.args.get("pid")
+        if pid is not None and not pid.isdigit():
+            abort(400, "pid must be a number")
+        latest = sampler.latest(int(pid) if pid else None)
+        if latest is None:
+            abort(404, "no finished profile")
+        response = Response(latest[1], mimetype="text/plain")
+        response.headers["X-Profile-Pid"] = str(latest[0])
+        return response
+
+    @admin.route("/heap/start", methods=["POST"])
+    def heap_start():
+        heap.start(frames=_number("frames", 1, int))
+        return jsonify({"pid": os.getpid(), "tracing": heap.tracing})
+
+    @admin.route("/heap", methods=["GET"])
+    def heap_diff():
+        return jsonify(heap.diff(top=_number("top", 25, int)))
+
+    @admin.route("/heap/stop", methods=["POST"])
+    def heap_stop():
+        heap.stop()
+        return jsonify({"pid": os.getpid(), "tracing": heap.tracing})
+
+    @admin.route("/slow", methods=["GET"])
+    def slow_requests():
+        watchdog = get_watchdog()
+        if watchdog is None:
+            abort(404, "the slow request watchdog is disabled")
+        return jsonify({"pid": os.getpid(), "requests": watchdog.recent()})
+
+    return admin
+
+
+def start_admin_server(token: str, profile_dir: str, port: int, host: str = "0.0.0.0"):
+    """Serve the admin endpoints from a background thread; used in socket mode.
+
+    Returns the server, whose shutdown() stops it.
+    """
+    sidecar = Flask("jitsi-slack-admin")
+    sidecar.register_blueprint(create_admin_blueprint(token, profile_dir))
+    server = make_server(host, port, sidecar, threaded=True)
+    threading.Thread(target=server.serve_forever, name="admin-server", daemon=True).start()
+    logger.info(f"admin endpoints listening on port {server.server_port}")
+    return server
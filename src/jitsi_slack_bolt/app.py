@@ -1,25 +1,26 @@
 import os
 import logging
 
-from flask import Flask, request
-from werkzeug.middleware.proxy_fix import ProxyFix
-
-from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
-
 from slack_bolt import App as BoltApp
-from slack_bolt.adapter.flask import SlackRequestHandler
-from slack_bolt.adapter.socket_mode import SocketModeHandler
-from slack_bolt.oauth.callback_options import CallbackOptions
 from slack_bolt.oauth.oauth_flow import SuccessArgs, FailureArgs
-from slack_bolt.oauth.oauth_settings import OAuthSettings
 from slack_bolt.response import BoltResponse
 
-from listeners import register_listeners
-from util.store import InMemoryStorageProvider, WorkspaceStore
-from util.vault import VaultStorageProvider
-from util.config import JitsiConfiguration, StorageType
-from util.slack_store import WorkspaceInstallationStore
-from util.postgres import PostgresStorageProvider
+from jitsi_slack_bolt.listeners import register_listeners
+from jitsi_slack_bolt.util.admission import AdmissionController, set_admission_controller
+from jitsi_slack_bolt.util.store import WorkspaceStore
+from jitsi_slack_bolt.util.config import JitsiConfiguration
+from jitsi_slack_bolt.util.request_log import RequestLogger, start_queued_logging
+from jitsi_slack_bolt.util.providers import create_storage_provider
+from jitsi_slack_bolt.util.probe import ServerProber, set_server_prober
+from jitsi_slack_bolt.util.room_guard import RoomNameGuard, set_room_name_guard
+from jitsi_slack_bolt.util.slack_store import WorkspaceInstallationStore
+from jitsi_slack_bolt.util.usage import FileUsageSink, UsageRecorder, set_usage_recorder
+from jitsi_slack_bolt.util.validation import ServerValidator, set_server_validator
+from jitsi_slack_bolt.util import tracing
+from jitsi_slack_bolt.util.watchdog import SlowRequestWatchdog, set_watchdog
+
+# storage providers and the flask/socket mode adapters pull in large dependency trees (hvac,
+# sqlalchemy, psycopg2, flask), so each one is imported only when the configuration selects it
 
 
 # bolt callbacks
@@ -31,24 +32,6 @@ def failure(args: FailureArgs) -> BoltResponse:
     return BoltResponse(status=args.suggested_status_code, body=args.reason)
 
 
-gunicorn_logger = logging.getLogger("gunicorn")
-
-metrics_port = os.environ.get("METRICS_PORT", "8080")
-
-
-# gunicorn callbacks
-def when_ready(server):
-    gunicorn_logger.info(
-        f"primary gunicorn server ready, starting metrics server on port {metrics_port}"
-    )
-    GunicornPrometheusMetrics.start_http_server_when_ready(int(metrics_port))
-
-
-def child_exit(server, worker):
-    gunicorn_logger.info("gunicorn worker exit")
-    GunicornPrometheusMetrics.mark_process_dead_on_child_exit(worker.pid)
-
-
 class JitsiSlackApp:
     def __init__(self):
         # load configuration from environment
@@ -57,49 +40,51 @@ class JitsiSlackApp:
         logging.basicConfig(level=getattr(logging, self.config.debug_level))
         self.logger = logging.getLogger("jitsi-slack")
         self.logger.info("starting jitsi-slack")
-
-        self.logger.info(
-            f"initializing workspace store with default server: {self.config.default_server_url}"
+        self.request_log = RequestLogger(
+            self.logger,
+            sample_rates=self.config.log_sample_rates,
+            default_rate=self.config.log_default_sample_rate,
+            redact_fields=self.config.log_redact_fields,
         )
-
-        if self.config.data_store_provider == StorageType.MEMORY:
-            self.logger.info("initializing memory storage provider")
-            storage_provider = InMemoryStorageProvider()
-        elif self.config.data_store_provider == StorageType.VAULT:
-            self.logger.info("initializing vault storage provider")
-            storage_provider = VaultStorageProvider(
-                url=self.config.vault_url,
-                token=self.config.vault_token,
-                mount_point=self.config.vault_mount_point,
-                path_prefix=self.config.vault_path_prefix,
+        self.log_listener = None
+        if self.config.log_async and not self.config.preload_app:
+            self.log_listener = start_queued_logging()
+
+        if self.config.trace_exporter != "none":
+            self.init_tracing()
+        if self.config.slow_request_threshold:
+            self.logger.info(
+                f"recording requests slower than {self.config.slow_request_threshold}s"
             )
-        elif self.config.data_store_provider == StorageType.POSTGRES:
-            self.logger.info("initializing postgres storage provider")
-            storage_provider = PostgresStorageProvider(
-                host=self.config.db_host,
-                ip=self.config.db_ip,
-                port=self.config.db_port,
-                username=self.config.db_username,
-                password=self.config.db_password,
-                database_name=self.config.db_name,
+            set_watchdog(
+                SlowRequestWatchdog(
+                    self.config.slow_request_threshold, capacity=self.config.slow_request_buffer
+                )
             )
-        else:
-            raise ValueError(f"Invalid storage provider: {self.config.data_store_provider}")
 
-        self.workspace_store = WorkspaceStore(storage_provider)
+        self.workspace_store = WorkspaceStore(
+            default_server_url=self.config.default_server_url,
+            read_timeout=self.config.storage_read_timeout,
+            breaker_failure_threshold=self.config.storage_breaker_failures,
+            breaker_reset_timeout=self.config.storage_breaker_reset,
+            resolved_ttl=self.config.resolved_url_ttl,
+        )
+        self.storage_initialized = False
 
-        # set default server URL to workspace_store if it isn't already defined
-        default_server = self.workspace_store.get_workspace_server_url("default")
-        if default_server is None or default_server.strip() == "":
-            self.logger.info(f"setting default server URL to {self.config.default_server_url}")
-            self.workspace_store.set_workspace_server_url("default", self.config.default_server_url)
+        # a preloaded app is built once in the gunicorn master and forked into every worker, so
+        # connection-holding storage is only opened in each worker (see post_fork)
+        if self.config.preload_app:
+            self.logger.info("preload mode: deferring storage initialization to worker post_fork")
         else:
-            self.logger.info(f"default server URL already set to {default_server}")
+            self.init_storage()
 
         self.logger.info(f"initializing bolt app in {self.config.slack_app_mode} mode")
         if self.config.slack_app_mode == "socket":
             self.bolt_app = BoltApp(token=os.environ.get("SLACK_BOT_TOKEN"))
         elif self.config.slack_app_mode == "oauth":
+            from slack_bolt.oauth.callback_options import CallbackOptions
+            from slack_bolt.oauth.oauth_settings import OAuthSettings
+
             self.bolt_app = BoltApp(
                 signing_secret=os.environ.get("SLACK_SIGNING_SECRET"),
                 installation_store=WorkspaceInstallationStore(self.workspace_store),
@@ -116,10 +101,22 @@ class JitsiSlackApp:
             )
 
         @self.bolt_app.middleware
-        def log_request(logger, body, next):
-            logger.debug(body)
+        def log_request(body, next):
+            self.request_log.log("bolt", "received request", payload=body)
             return next()
 
+        if tracing.get_tracer() is not None or self.config.slow_request_threshold:
+
+            @self.bolt_app.middleware
+            def trace_slack_calls(context, next):
+                # listeners receive these from the context, so wrapping them here times every
+                # Web API method and response_url post (for traces and slow request stages)
+                # without changing the handlers
+                context["client"] = tracing.TracedWebClient(context.client)
+                if context.respond is not None:
+                    context["respond"] = tracing.traced_callable("slack.respond", context.respond)
+                return next()
+
         @self.bolt_app.event("app_uninstalled")
         def handle_app_uninstalled(event, logger):
             if "team_id" not in event:
@@ -136,6 +133,46 @@ class JitsiSlackApp:
                 logger.info(f"tokens revoked for workspace {event['team_id']}")
                 self.workspace_store.delete_workspace(event["team_id"])
 
+        if self.config.room_name_guard:
+            self.logger.info(
+                f"deduplicating room names over {self.config.room_name_guard_window}s windows"
+            )
+            set_room_name_guard(
+                RoomNameGuard(
+                    window=self.config.room_name_guard_window,
+                    capacity=self.config.room_name_guard_capacity,
+                    error_rate=self.config.room_name_guard_error_rate,
+                )
+            )
+        if self.config.server_probe_interval:
+            set_server_prober(
+                ServerProber(
+                    interval=self.config.server_probe_interval,
+                    timeout=self.config.server_probe_timeout,
+                )
+            )
+        if self.config.server_validation_timeout:
+            set_server_validator(
+                ServerValidator(
+                    timeout=self.config.server_validation_timeout,
+                    cache_ttl=self.config.server_validation_cache_ttl,
+                )
+            )
+        if (
+            self.config.admission_team_rate
+            or self.config.admission_user_rate
+            or self.config.admission_concurrency
+        ):
+            set_admission_controller(
+                AdmissionController(
+                    team_rate=self.config.admission_team_rate,
+                    team_burst=self.config.admission_team_burst,
+                    user_rate=self.config.admission_user_rate,
+                    user_burst=self.config.admission_user_burst,
+                    max_concurrent=self.config.admission_concurrency,
+                )
+            )
+
         self.logger.info(f"registering bolt listeners for {self.config.slash_cmd}")
         register_listeners(self.bolt_app, self.workspace_store, self.config.slash_cmd)
 
@@ -144,34 +181,115 @@ class JitsiSlackApp:
 
         self.logger.info("jitsi-slack is ready to go!")
 
+    def init_storage(self):
+        self.logger.info(
+            f"initializing workspace store with default server: {self.config.default_server_url}"
+        )
+
+        self.logger.info(f"initializing {self.config.data_store_provider.value} storage provider")
+        storage_provider = create_storage_provider(self.config, self.config.data_store_provider)
+        self.workspace_store.set_provider(storage_provider)
+        if self.config.usage_log != "none":
+            self.init_usage_log(storage_provider)
+
+        # set default server URL to workspace_store if it isn't already defined
+        default_server = self.workspace_store.get_workspace_server_url("default")
+        if default_server is None or default_server.strip() == "":
+            self.logger.info(f"setting default server URL to {self.config.default_server_url}")
+            self.workspace_store.set_workspace_server_url("default", self.config.default_server_url)
+        else:
+            self.logger.info(f"default server URL already set to {default_server}")
+
+        self.storage_initialized = True
+
+    def init_usage_log(self, storage_provider):
+        """Install a recorder writing usage events to the configured file or Postgres table."""
+        if self.config.usage_log == "file":
+            sink = FileUsageSink(self.config.usage_log_file)
+        else:
+            from jitsi_slack_bolt.util.postgres import PostgresUsageSink
+
+            sink = PostgresUsageSink(storage_provider)
+        self.logger.info(f"recording usage events to {self.config.usage_log}")
+        set_usage_recorder(
+            UsageRecorder(
+                sink,
+                max_queue_size=self.config.usage_queue_size,
+                batch_size=self.config.usage_batch_size,
+                flush_interval=self.config.usage_flush_interval,
+            )
+        )
+
+    def init_tracing(self):
+        """Install a tracer exporting spans to the configured file or OTLP collector."""
+        if self.config.trace_exporter == "file":
+            exporter = tracing.FileExporter(self.config.trace_file)
+        else:
+            exporter = tracing.OtlpHttpExporter(self.config.trace_otlp_endpoint)
+        self.logger.info(
+            f"tracing {self.config.trace_sample_rate:.0%} of commands to {self.config.trace_exporter}"
+        )
+        tracing.set_tracer(
+            tracing.Tracer(
+                exporter,
+                sample_rate=self.config.trace_sample_rate,
+                slow_threshold=self.config.trace_slow_threshold,
+            )
+        )
+
+    def post_fork(self):
+        """Finish initializing a preloaded app inside a freshly forked gunicorn worker."""
+        if self.config.log_async and self.log_listener is None:
+            self.log_listener = start_queued_logging()
+        self.workspace_store.reset_after_fork()
+        if not self.storage_initialized:
+            self.init_storage()
+
     def init_flask_app(self):
         self.logger.info("setting up flask")
+        from flask import Flask, request
+        from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
+        from slack_bolt.adapter.flask import SlackRequestHandler
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
         self.flask_app = Flask(__name__)
         self.flask_handler = SlackRequestHandler(self.bolt_app)
         self.metrics = GunicornPrometheusMetrics(app=self.flask_app)
 
         @self.flask_app.route("/slack/events", methods=["POST"])
         def slack_events():
-            self.logger.debug(f"received event {request}")
+            self.request_log.log(
+                "slack_events", "received event %s %s", request.method, request.path
+            )
             return self.flask_handler.handle(request)
 
         # TODO: does this actually get called or does it go through oauth_redirect?
         @self.flask_app.route("/slack/install", methods=["GET"])
         def install():
-            self.logger.debug(f"received install {request}")
+            self.request_log.log("install", "received install %s %s", request.method, request.path)
             return self.flask_handler.handle(request)
 
         @self.flask_app.route("/slack/oauth_redirect", methods=["GET"])
         def oauth_redirect():
-            self.logger.debug(f"received oauth redirect {request}")
+            self.request_log.log(
+                "oauth_redirect", "received oauth redirect %s %s", request.method, request.path
+            )
             return self.flask_handler.handle(request)
 
         @self.flask_app.route("/health", methods=["GET"])
         @self.metrics.do_not_track()
         def health():
-            self.logger.debug("health check")
+            self.request_log.log("health", "health check")
             return "OK"
 
+        if self.config.admin_token:
+            from jitsi_slack_bolt.admin import create_admin_blueprint
+
+            self.logger.info("enabling admin endpoints under /admin")
+            self.flask_app.register_blueprint(
+                create_admin_blueprint(self.config.admin_token, self.config.profile_dir)
+            )
+
         if self.config.proxy_mode == "true":
             self.flask_app.wsgi_app = ProxyFix(
                 self.flask_app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1
@@ -181,7 +299,18 @@ class JitsiSlackApp:
         return self.flask_app
 
     def start(self):
+        if not self.storage_initialized:
+            self.init_storage()
+
         if self.config.slack_app_mode == "socket":
+            from slack_bolt.adapter.socket_mode import SocketModeHandler
+
+            if self.config.admin_token:
+                from jitsi_slack_bolt.admin import start_admin_server
+
+                start_admin_server(
+                    self.config.admin_token, self.config.profile_dir, self.config.admin_port
+                )
             SocketModeHandler(self.bolt_app, os.environ["SLACK_APP_TOKEN"]).start()
         elif self.config.slack_app_mode == "oauth":
             self.flask_app.run(debug=True, host="0.0.0.0", port=int(os.environ.get("PORT", 3000)))
@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
-from app import when_ready, child_exit
+import gc
+from hooks import when_ready, pre_fork, post_fork, child_exit
 from os import getenv
 
 gunicorn_workers = getenv("GUNICORN_WORKERS", "1")
+gunicorn_preload_app = getenv("GUNICORN_PRELOAD_APP", "false").lower()
 http_port = getenv("PORT", "3000")
 debug_level = getenv("DEBUG_LEVEL", "info").lower()
 
 bind = "0.0.0.0:" + http_port
 workers = int(gunicorn_workers)
 loglevel = debug_level
+preload_app = gunicorn_preload_app == "true"
+
+if preload_app:
+    # avoid leaving freed holes in pages the workers will share; re-enabled in pre_fork
+    gc.disable()
 
 # Server Hooks
 when_ready = when_ready
+pre_fork = pre_fork
+post_fork = post_fork
 child_exit = child_exit
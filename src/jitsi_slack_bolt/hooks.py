@@ -0,0 +1,63 @@
+"""
+Gunicorn server hooks for the Jitsi Slack integration.
+
+These hooks are kept apart from app.py so that loading the gunicorn configuration does not
+construct the Slack app in the master process unless preloading is enabled.
+"""
+
+import gc
+import logging
+import os
+
+gunicorn_logger = logging.getLogger("gunicorn")
+
+metrics_port = os.environ.get("METRICS_PORT", "8080")
+# seconds between compactions of exited workers' metric files; 0 disables compaction
+metrics_compact_interval = float(os.environ.get("METRICS_COMPACT_INTERVAL", "300"))
+
+compactor = None
+
+
+def when_ready(server):
+    global compactor
+    gunicorn_logger.info(
+        f"primary gunicorn server ready, starting metrics server on port {metrics_port}"
+    )
+    from prometheus_client import CollectorRegistry, start_http_server
+    from jitsi_slack_bolt.util.multiprocess import (
+        CompactingMultiProcessCollector,
+        MultiprocessCompactor,
+    )
+
+    registry = CollectorRegistry()
+    collector = CompactingMultiProcessCollector(registry)
+    start_http_server(int(metrics_port), registry=registry)
+
+    if metrics_compact_interval > 0:
+        compactor = MultiprocessCompactor(collector._path, metrics_compact_interval)
+        compactor.start()
+
+
+def pre_fork(server, worker):
+    # move everything the preloaded master allocated into the permanent generation so that
+    # collections in the workers never write to (and so copy) the shared pages
+    if server.cfg.preload_app:
+        gc.freeze()
+        gc.enable()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app import jitsi_slack_app
+
+        gunicorn_logger.info(f"initializing preloaded app in worker {worker.pid}")
+        jitsi_slack_app.post_fork()
+
+
+def child_exit(server, worker):
+    gunicorn_logger.info("gunicorn worker exit")
+    from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
+
+    GunicornPrometheusMetrics.mark_process_dead_on_child_exit(worker.pid)
+    if compactor is not None:
+        compactor.mark_dead(worker.pid)
@@ -24,7 +24,10 @@ from slack_bolt import Ack, Respond
 from logging import Logger
 from slack_sdk import WebClient
 
+from jitsi_slack_bolt.util.admission import admit
 from jitsi_slack_bolt.util.store import WorkspaceStore
+from jitsi_slack_bolt.util.tracing import span
+from jitsi_slack_bolt.util.watchdog import watch_request
 from jitsi_slack_bolt.listeners.jitsi_handlers import (
     slash_jitsi,
     slash_jitsi_server,
@@ -42,13 +45,32 @@ def jitsi_callback(
     slash_cmd: str,
     workspace_store: WorkspaceStore,
 ):
-    ack()
-
     if command["text"].startswith("server"):
-        slash_jitsi_server(command, logger, respond, workspace_store)
+        subcommand = "server"
     elif command["text"].startswith("@"):
-        slash_jitsi_dm(client, command, logger, respond, workspace_store)
+        subcommand = "dm"
     elif command["text"].startswith("help"):
-        slash_jitsi_help(respond, slash_cmd, workspace_store)
+        subcommand = "help"
     else:
-        slash_jitsi(command, logger, respond, workspace_store)
+        subcommand = "room"
+
+    attributes = {"team_id": command.get("team_id"), "subcommand": subcommand}
+    with (
+        span("jitsi_callback", **attributes),
+        watch_request("jitsi_callback", **attributes),
+        admit(command.get("team_id"), command.get("user_id"), subcommand) as rejection,
+    ):
+        if rejection is not None:
+            # answered from the acknowledgement, before any storage or Slack API call
+            ack(rejection)
+            return
+        ack()
+
+        if subcommand == "server":
+            slash_jitsi_server(command, logger, respond, workspace_store)
+        elif subcommand == "dm":
+            slash_jitsi_dm(client, command, logger, respond, workspace_store)
+        elif subcommand == "help":
+            slash_jitsi_help(respond, slash_cmd, workspace_store)
+        else:
+            slash_jitsi(command, logger, respond, workspace_store)
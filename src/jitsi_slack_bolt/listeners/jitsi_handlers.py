@@ -11,7 +11,9 @@ Commands:
   /jitsi : Creates a Jitsi room with a random name
   /jitsi server : Shows current server configuration for the workspace
   /jitsi server default : Resets server to default - https://meet.jit.si/
-  /jitsi server <url> : Sets custom server URL for the workspace
+  /jitsi server <url> [<url> ...] : Sets custom server URL (or pool of servers) for the workspace
+  /jitsi server channel [default|<url> ...] : Sets (or with default, removes) the channel's server
+  /jitsi server org [default|<url> ...] : Sets (or removes) the Enterprise Grid organization's server
   /jitsi @<user> : Creates a Jitsi room and sends it via DM
 
 Dependencies:
@@ -20,18 +22,22 @@ Dependencies:
   - logging
 """
 
+from functools import partial
 from slack_bolt import Respond
 from logging import Logger
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from slack_sdk.http_retry.builtin_handlers import RateLimitErrorRetryHandler
 from ..util.store import WorkspaceStore
-from ..util.room_name import generate_room_name
+from ..util.room_guard import issue_room_name
+from ..util.probe import choose_server, parse_pool
+from ..util.usage import record_usage
+from ..util.validation import get_server_validator
 from ..util import build_join_message_blocks, build_help_message_blocks
 from urllib.parse import quote
 from urllib.parse import urljoin
 from urllib.parse import urlparse
-from typing import Dict, Any, Tuple, Optional, List
+from typing import Callable, Dict, Any, Tuple, Optional, List
 
 
 def build_room_url(
@@ -40,12 +46,14 @@ def build_room_url(
     room_str: Optional[str] = None,
 ) -> Tuple[str, str]:
     """builds a Jitsi room URL based on workspace's server URL and either a random or deterministic room name"""
-    server_url = workspace_store.get_workspace_server_url(
-        command["team_id"]
-    ) or workspace_store.get_workspace_server_url("default")
+    server_url = choose_server(
+        workspace_store.resolve_server_url(
+            command["team_id"], command.get("channel_id"), command.get("enterprise_id")
+        )
+    )
     if not room_str:
         # generate random room name
-        room_name = generate_room_name()
+        room_name = issue_room_name(server_url)
     else:
         # sanitize room name
         room_name = quote(room_str)
@@ -66,45 +74,155 @@ def slash_jitsi(
         server_url, room_url = build_room_url(command, workspace_store, room_str=command["text"])
     else:
         server_url, room_url = build_room_url(command, workspace_store)
+    record_usage(command["team_id"], command.get("channel_id"), "room", server_url)
 
     msg_blocks = build_join_message_blocks(f"A Jitsi meeting has started at {server_url}", room_url)
     respond(blocks=msg_blocks, response_type="in_channel")
 
 
+# how `/jitsi server` describes the level a server URL was resolved at
+SERVER_URL_SCOPES = {
+    "channel": "This channel's",
+    "team": "Your team's",
+    "enterprise": "Your organization's",
+    "default": "Your team's",
+}
+
+INVALID_SERVER_URL = (
+    "Invalid format for a server URL - must include scheme (e.g., https://) and hostname"
+)
+
+
+def parse_server_url(text: str) -> Optional[str]:
+    """normalizes a server URL given to /jitsi server, or returns None if it is not a URL"""
+    parsed_url = urlparse(text)
+    if not parsed_url.scheme or not parsed_url.netloc:
+        return None
+    server_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
+    if not server_url.endswith("/"):
+        server_url += "/"
+    return server_url
+
+
+def parse_server_pool(args: List[str]) -> Optional[str]:
+    """normalizes the server URLs given to /jitsi server into a pool setting, or returns None if
+    any of them is not a URL"""
+    server_urls = [parse_server_url(arg) for arg in args]
+    if None in server_urls:
+        return None
+    return " ".join(server_urls)
+
+
+def describe_servers(server_url: Optional[str]) -> str:
+    """formats a server URL setting, which may be a pool, for a response"""
+    return ", ".join(parse_pool(server_url)) or str(server_url)
+
+
+def save_server_url(server_url: str, save: Callable[[str], None], message: str, respond: Respond):
+    """saves a server URL setting and responds with `message`; when a validator is installed, only
+    once every server in the setting has been found reachable"""
+    validator = get_server_validator()
+    if validator is None:
+        save(server_url)
+        respond(message)
+        return
+
+    def finish(failure: Optional[str]):
+        if failure:
+            respond(f"The conference server was not changed: {failure}.")
+        else:
+            save(server_url)
+            respond(message)
+
+    if not validator.validate_async(parse_pool(server_url), finish):
+        respond(f"Checking that {describe_servers(server_url)} is reachable...")
+
+
 def slash_jitsi_server(
     command: Dict[str, Any],
     logger: Logger,
     respond: Respond,
     workspace_store: WorkspaceStore,
 ):
-    """slash command that sets or views the Jitsi server for the workspace"""
-    decomp = command["text"].split(" ")
+    """slash command that sets or views the Jitsi server for the workspace, channel or org"""
+    decomp = command["text"].split()
 
     if len(decomp) == 1:
-        server_url = workspace_store.get_workspace_server_url(command["team_id"])
-        respond(f"Your team's conferences are hosted at: {server_url}")
+        resolved = workspace_store.resolve(
+            command["team_id"], command.get("channel_id"), command.get("enterprise_id")
+        )
+        respond(
+            f"{SERVER_URL_SCOPES[resolved.level]} conferences are hosted at: "
+            f"{describe_servers(resolved.url)}"
+        )
+        return
+
+    if len(decomp) >= 3 and decomp[1] in ("channel", "org"):
+        slash_jitsi_server_override(command, decomp[1], decomp[2:], respond, workspace_store)
+    elif decomp[1:] == ["default"]:
+        default_server_url = workspace_store.get_workspace_server_url("default")
+        workspace_store.set_workspace_server_url(command["team_id"], default_server_url)
+        respond(
+            "Your team's conference URL has been set to the default: "
+            f"{describe_servers(default_server_url)}"
+        )
+    elif decomp[1] not in ("channel", "org", "default"):
+        server_url = parse_server_pool(decomp[1:])
+        if server_url is None:
+            respond(INVALID_SERVER_URL)
+            return
+        logger.debug(f"workspace store provider is {workspace_store._provider}")
+        save_server_url(
+            server_url,
+            partial(workspace_store.set_workspace_server_url, command["team_id"]),
+            f"Your team's conferences will be hosted at: {describe_servers(server_url)}",
+            respond,
+        )
+    else:
+        respond("usage: /jitsi server [channel|org] [default|<server> ...]")
+
+
+def slash_jitsi_server_override(
+    command: Dict[str, Any],
+    scope: str,
+    args: List[str],
+    respond: Respond,
+    workspace_store: WorkspaceStore,
+):
+    """sets or removes the server URL of the channel or the Enterprise Grid org"""
+    team_id, channel_id = command["team_id"], command["channel_id"]
+    enterprise_id = command.get("enterprise_id")
+    if scope == "org" and not enterprise_id:
+        respond("This workspace is not part of an Enterprise Grid organization.")
         return
+    owner = SERVER_URL_SCOPES["channel" if scope == "channel" else "enterprise"]
 
-    if len(decomp) == 2:
-        if decomp[1] == "default":
-            default_server_url = workspace_store.get_workspace_server_url("default")
-            workspace_store.set_workspace_server_url(command["team_id"], default_server_url)
-            respond(f"Your team's conference URL has been set to the default: {default_server_url}")
+    if args == ["default"]:
+        if scope == "channel":
+            workspace_store.delete_channel_server_url(team_id, channel_id)
         else:
-            parsed_url = urlparse(decomp[1])
-            if not parsed_url.scheme or not parsed_url.netloc:
-                respond(
-                    "Invalid format for a server URL - must include scheme (e.g., https://) and hostname"
-                )
-                return
-            server_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
-            if not server_url.endswith("/"):
-                server_url += "/"
-            logger.debug(f"workspace store provider is {workspace_store._provider}")
-            workspace_store.set_workspace_server_url(command["team_id"], server_url)
-            respond(f"Your team's conferences will be hosted at: {server_url}")
+            workspace_store.delete_enterprise_server_url(enterprise_id)
+        server_url = workspace_store.resolve_server_url(team_id, channel_id, enterprise_id)
+        respond(
+            f"{owner} conference URL has been removed, conferences are hosted at: "
+            f"{describe_servers(server_url)}"
+        )
+        return
+
+    server_url = parse_server_pool(args)
+    if server_url is None:
+        respond(INVALID_SERVER_URL)
+        return
+    if scope == "channel":
+        save = partial(workspace_store.set_channel_server_url, team_id, channel_id)
     else:
-        respond("usage: /jitsi server [default|<server>]")
+        save = partial(workspace_store.set_enterprise_server_url, enterprise_id)
+    save_server_url(
+        server_url,
+        save,
+        f"{owner} conferences will be hosted at: {describe_servers(server_url)}",
+        respond,
+    )
 
 
 def slash_jitsi_dm(
@@ -143,6 +261,7 @@ def slash_jitsi_dm(
 
         try:
             server_url, room_url = build_room_url(command, workspace_store)
+            record_usage(command["team_id"], command.get("channel_id"), "dm", server_url)
             msg_blocks = build_join_message_blocks(
                 f"<@{command['user_name']}> would like you to join a Jitsi meeting at : {server_url}",
                 room_url,
@@ -0,0 +1,257 @@
+"""
+Copy every workspace record from one storage provider to another.
+
+    python -m jitsi_slack_bolt.migrate --source vault --target postgres --checkpoint migrate.ckpt
+
+A source or target is a storage provider (memory, vault or postgres, configured from the same
+environment variables as the app) or the path of a JSON lines file ending in .jsonl, which can
+be used to export, back up or import the records.
+
+Keys are listed from the source in sorted pages of --batch-size; each page is read and written
+in bulk by one of --workers threads, so a page costs a couple of round trips rather than a few
+per workspace. Values missing from the source are left as they are in the target, and writing a
+record twice is harmless, so a migration can run against live systems and be run again.
+
+With --checkpoint, the last key of the pages copied so far is saved to a file after each page,
+and a migration that was interrupted resumes from there. --verify reads every record back from
+both sides afterwards and reports those that differ.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from jitsi_slack_bolt.util.config import JitsiConfiguration, StorageType
+from jitsi_slack_bolt.util.providers import create_storage_provider
+from jitsi_slack_bolt.util.store import InMemoryStorageProvider, StorageProvider, WorkspaceRecord
+
+
+class JsonLinesStorageProvider(InMemoryStorageProvider):
+    """Workspace records kept in a JSON lines file, one record per line.
+
+    The file is loaded when opened, and writes are appended to it; when a key appears on several
+    lines, its latest values win. The file holds OAuth tokens, so it is created readable by its
+    owner only.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as lines:
+                for line in filter(str.strip, lines):
+                    InMemoryStorageProvider.set_workspaces(
+                        self, [WorkspaceRecord(**json.loads(line))]
+                    )
+
+    def _append(self, records: Sequence[WorkspaceRecord]) -> None:
+        lines = "".join(
+            json.dumps(record._asdict(), separators=(",", ":")) + "\n" for record in records
+        )
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        with open(fd, "a", encoding="utf-8") as out:
+            out.write(lines)
+
+    def set_oauth(self, workspace_id: str, oauth_token: str) -> None:
+        self.set_workspaces([WorkspaceRecord(workspace_id, oauth_token, None)])
+
+    def set_server_url(self, workspace_id: str, server_url: str) -> None:
+        self.set_workspaces([WorkspaceRecord(workspace_id, None, server_url)])
+
+    def set_workspaces(self, records: Sequence[WorkspaceRecord]) -> None:
+        with self._lock:
+            self._append(records)
+            for record in records:
+                if record.oauth_token is not None:
+                    self._oauth_tokens[record.workspace_id] = record.oauth_token
+                if record.server_url is not None:
+                    self._server_urls[record.workspace_id] = record.server_url
+
+
+def open_provider(spec: str, config: JitsiConfiguration) -> StorageProvider:
+    """Open a storage provider by name, or a JSON lines file by path."""
+    if spec.endswith(".jsonl"):
+        return JsonLinesStorageProvider(spec)
+    try:
+        provider = StorageType(spec.lower())
+    except ValueError:
+        raise ValueError(f"Invalid storage provider: {spec}")
+    config.check_storage(provider)
+    return create_storage_provider(config, provider)
+
+
+def read_checkpoint(path: Optional[str]) -> Optional[str]:
+    """Return the last key copied by an earlier run, or None to start from the beginning."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as checkpoint:
+        return json.load(checkpoint)["after"]
+
+
+def write_checkpoint(path: str, after: str) -> None:
+    # written to a temporary file and renamed, so an interrupted write leaves the old checkpoint
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as checkpoint:
+        json.dump({"after": after}, checkpoint)
+    os.replace(tmp, path)
+
+
+class MigrationResult(NamedTuple):
+    copied: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        return self.copied / self.seconds if self.seconds else 0.0
+
+
+class Migration:
+    """Copies records from `source` to `target` a page at a time on a pool of threads.
+
+    Args:
+        batch_size: keys listed, read and written at once
+        workers: pages copied in parallel
+        checkpoint: file the last key of the contiguous pages copied so far is saved to
+        progress: called with the records copied so far after each page
+    """
+
+    def __init__(
+        self,
+        source: StorageProvider,
+        target: StorageProvider,
+        batch_size: int = 500,
+        workers: int = 4,
+        checkpoint: Optional[str] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ):
+        if batch_size < 1 or workers < 1:
+            raise ValueError("batch size and workers must be at least 1")
+        self.source = source
+        self.target = target
+        self.batch_size = batch_size
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.progress = progress
+
+    def pages(self, after: Optional[str] = None) -> Iterator[List[str]]:
+        """List the source's keys a page at a time, starting after `after`."""
+        while True:
+            page = self.source.list_workspaces(after=after, limit=self.batch_size)
+            if not page:
+                return
+            yield page
+            if len(page) < self.batch_size:
+                return
+            after = page[-1]
+
+    def _copy(self, page: List[str]) -> int:
+        self.target.set_workspaces(self.source.get_workspaces(page))
+        return len(page)
+
+    def run(self) -> MigrationResult:
+        """Copy every record after the checkpoint, if any."""
+        started = time.perf_counter()
+        copied = 0
+        # pages finish out of order; the checkpoint only moves past a page once every page
+        # before it has finished too, so resuming never skips a page
+        pending: Dict[Future, int] = {}
+        last_keys: Dict[int, str] = {}
+        finished: Dict[int, str] = {}
+        next_to_checkpoint = 0
+
+        def collect(block: bool) -> None:
+            nonlocal copied, next_to_checkpoint
+            done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                copied += future.result()
+                finished[index] = last_keys.pop(index)
+                if self.progress:
+                    self.progress(copied)
+            last = None
+            while next_to_checkpoint in finished:
+                last = finished.pop(next_to_checkpoint)
+                next_to_checkpoint += 1
+            if last is not None and self.checkpoint:
+                write_checkpoint(self.checkpoint, last)
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="migrate") as pool:
+            try:
+                for index, page in enumerate(self.pages(read_checkpoint(self.checkpoint))):
+                    # list ahead of the workers by a bounded number of pages
+                    while len(pending) >= 2 * self.workers:
+                        collect(block=True)
+                    last_keys[index] = page[-1]
+                    pending[pool.submit(self._copy, page)] = index
+                    collect(block=False)
+                while pending:
+                    collect(block=True)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return MigrationResult(copied, time.perf_counter() - started)
+
+    def verify(self) -> List[str]:
+        """Compare every record of the source with the target's; returns the keys that differ."""
+        mismatched = []
+        for page in self.pages():
+            expected = self.source.get_workspaces(page)
+            actual = self.target.get_workspaces(page)
+            mismatched.extend(
+                want.workspace_id for want, got in zip(expected, actual) if want != got
+            )
+        return mismatched
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", required=True, help="memory, vault, postgres or a .jsonl file")
+    parser.add_argument("--target", required=True, help="memory, vault, postgres or a .jsonl file")
+    parser.add_argument("--workers", type=int, default=4, help="pages copied in parallel")
+    parser.add_argument("--batch-size", type=int, default=500, help="keys copied at once")
+    parser.add_argument("--checkpoint", help="file to resume an interrupted migration from")
+    parser.add_argument("--verify", action="store_true", help="compare the records afterwards")
+    args = parser.parse_args(argv)
+
+    config = JitsiConfiguration.from_env()
+    source = open_provider(args.source, config)
+    target = open_provider(args.target, config)
+    last_report = time.monotonic()
+    started = time.perf_counter()
+
+    def report(copied: int) -> None:
+        nonlocal last_report
+        if time.monotonic() - last_report >= 1:
+            last_report = time.monotonic()
+            rate = copied / (time.perf_counter() - started)
+            print(f"copied {copied} records ({rate:.0f} records/s)", file=sys.stderr)
+
+    migration = Migration(
+        source,
+        target,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint=args.checkpoint,
+        progress=report,
+    )
+    result = migration.run()
+    print(f"copied {result.copied} records in {result.seconds:.1f}s ({result.rate:.0f} records/s)")
+
+    if args.verify:
+        mismatched = migration.verify()
+        if mismatched:
+            print(f"{len(mismatched)} records differ, e.g. {', '.join(mismatched[:10])}")
+            return 1
+        print("every record matches")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Admission Control
+
+Limits how fast each team and each user may run commands, with a token bucket per team and per
+user, and how many expensive subcommands (such as DMs to a list of users) may run at once. A
+rejected command is answered straight from the acknowledgement with a short message, before any
+storage read or Slack API call.
+
+Buckets and concurrency slots are per worker process. Admission control is disabled until
+set_admission_controller() installs a controller.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import Counter
+
+THROTTLED_REQUESTS = Counter(
+    "jitsi_slack_throttled_requests_total",
+    "Commands rejected by admission control",
+    ["reason", "subcommand"],
+)
+
+TEAM_LIMITED = (
+    "Your team is sending commands faster than this app allows, please try again in {} seconds."
+)
+USER_LIMITED = (
+    "You are sending commands faster than this app allows, please try again in {} seconds."
+)
+BUSY = "Too many of these requests are being handled right now, please try again in a moment."
+
+
+def parse_concurrency_limits(spec: Optional[str]) -> Dict[str, int]:
+    """Parse "subcommand=limit,subcommand=limit" into a dict, e.g. "dm=2,room=20"."""
+    limits = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        subcommand, sep, limit = entry.partition("=")
+        if not sep or int(limit) < 1:
+            raise ValueError(f"invalid concurrency limit {entry!r}; expected subcommand=limit")
+        limits[subcommand.strip()] = int(limit)
+    return limits
+
+
+class TokenBucket:
+    """Allows `burst` requests at once, refilled at `rate` requests per second."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def refill(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return self.tokens
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available, as of the last refill."""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class AdmissionController:
+    """Token bucket rate limits per team and per user, and concurrency limits per subcommand.
+
+    Args:
+        team_rate: commands per second each team may sustain; 0 disables the team limit
+        team_burst: commands a team may run at once after being idle
+        user_rate: commands per second each user may sustain; 0 disables the user limit
+        user_burst: commands a user may run at once after being idle
+        max_concurrent: subcommands that may only run this many at a time
+        max_buckets: buckets kept per kind; the least recently used is dropped (and so refilled)
+    """
+
+    def __init__(
+        self,
+        team_rate: float = 0.0,
+        team_burst: float = 1.0,
+        user_rate: float = 0.0,
+        user_burst: float = 1.0,
+        max_concurrent: Optional[Dict[str, int]] = None,
+        max_buckets: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.team_rate = team_rate
+        self.team_burst = team_burst
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_buckets = max_buckets
+        self._clock = clock
+        self._slots = {
+            subcommand: threading.BoundedSemaphore(limit)
+            for subcommand, limit in (max_concurrent or {}).items()
+        }
+        self._teams: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._users: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, buckets, key: str, rate: float, burst: float, now: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, burst, now)
+            if len(buckets) > self.max_buckets:
+                buckets.popitem(last=False)
+        buckets.move_to_end(key)
+        bucket.refill(now)
+        return bucket
+
+    def check_rate(
+        self, team_id: Optional[str], user_id: Optional[str]
+    ) -> Optional[Tuple[str, str]]:
+        """Take a token from the team's and the user's buckets.
+
+        If either is empty neither is charged, and the limit ("team" or "user") and the message
+        to reject the command with are returned.
+        """
+        now = self._clock()
+        with self._lock:
+            buckets = []
+            if self.team_rate and team_id:
+                team = self._bucket(self._teams, team_id, self.team_rate, self.team_burst, now)
+                if team.tokens < 1:
+                    return "team", TEAM_LIMITED.format(math.ceil(team.wait_time()))
+                buckets.append(team)
+            if self.user_rate and user_id:
+                key = f"{team_id}:{user_id}"
+                user = self._bucket(self._users, key, self.user_rate, self.user_burst, now)
+                if user.tokens < 1:
+                    return "user", USER_LIMITED.format(math.ceil(user.wait_time()))
+                buckets.append(user)
+            for bucket in buckets:
+                bucket.tokens -= 1
+        return None
+
+    @contextmanager
+    def admit(
+        self, team_id: Optional[str], user_id: Optional[str], subcommand: str
+    ) -> Iterator[Optional[str]]:
+        """Admit a command for the enclosed block.
+
+        Yields None when the command may run, holding its subcommand's concurrency slot until
+        the block exits, or the message to reject it with.
+        """
+        limited = self.check_rate(team_id, user_id)
+        if limited is not None:
+            reason, message = limited
+            THROTTLED_REQUESTS.labels(reason=reason, subcommand=subcommand).inc()
+            yield message
+            return
+
+        slots = self._slots.get(subcommand)
+        if slots is None:
+            yield None
+            return
+        if not slots.acquire(blocking=False):
+            THROTTLED_REQUESTS.labels(reason="concurrency", subcommand=subcommand).inc()
+            yield BUSY
+            return
+        try:
+            yield None
+        finally:
+            slots.release()
+
+
+_admission_controller: Optional[AdmissionController] = None
+
+
+def set_admission_controller(controller: Optional[AdmissionController]) -> None:
+    """Install (or with None, remove) the controller used by admit."""
+    global _admission_controller
+    _admission_controller = controller
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    return _admission_controller
+
+
+def admit(team_id: Optional[str], user_id: Optional[str], subcommand: str):
+    """Admit a command with the installed controller; yields None when there is none."""
+    if _admission_controller is None:
+        return nullcontext()
+    return _admission_controller.admit(team_id, user_id, subcommand)
@@ -2,7 +2,21 @@ from dataclasses import dataclass
 from enum import Enum
 import os
 import logging
-from typing import Optional
+import tempfile
+from typing import Dict, FrozenSet, Optional
+
+from .admission import parse_concurrency_limits
+from .usage import USAGE_SINKS
+from .request_log import DEFAULT_REDACTED_FIELDS, check_sample_rate, parse_sample_rates
+
+# Slack expects slash commands to be acknowledged within this many seconds
+SLACK_ACK_WINDOW_SECONDS = 3.0
+
+# a command may need up to three storage reads (installation token, team URL and default URL),
+# so each read gets an equal share of the acknowledgement window by default
+DEFAULT_STORAGE_READ_TIMEOUT = SLACK_ACK_WINDOW_SECONDS / 3
+
+TRACE_EXPORTERS = ("none", "file", "otlp")
 
 
 class StorageType(Enum):
@@ -22,6 +36,7 @@ class JitsiConfiguration:
     slash_cmd: str
     metrics_port: str
     proxy_mode: Optional[str]
+    preload_app: bool = False
     vault_url: Optional[str] = None
     vault_token: Optional[str] = None
     vault_mount_point: Optional[str] = "kv"
@@ -32,6 +47,42 @@ class JitsiConfiguration:
     db_username: Optional[str] = None
     db_password: Optional[str] = None
     db_name: Optional[str] = "jitsi-slack"
+    storage_read_timeout: Optional[float] = DEFAULT_STORAGE_READ_TIMEOUT
+    storage_breaker_failures: int = 5
+    storage_breaker_reset: float = 30.0
+    resolved_url_ttl: float = 30.0
+    room_name_guard: bool = False
+    room_name_guard_window: float = 86400.0
+    room_name_guard_capacity: int = 10000
+    room_name_guard_error_rate: float = 0.001
+    server_probe_interval: float = 10.0
+    server_probe_timeout: float = 2.0
+    server_validation_timeout: Optional[float] = 3.0
+    server_validation_cache_ttl: float = 300.0
+    admission_team_rate: float = 5.0
+    admission_team_burst: float = 50.0
+    admission_user_rate: float = 1.0
+    admission_user_burst: float = 10.0
+    admission_concurrency: Optional[Dict[str, int]] = None
+    usage_log: str = "none"
+    usage_log_file: str = "usage.jsonl"
+    usage_queue_size: int = 10000
+    usage_batch_size: int = 500
+    usage_flush_interval: float = 5.0
+    log_async: bool = True
+    log_sample_rates: Optional[Dict[str, float]] = None
+    log_default_sample_rate: float = 1.0
+    log_redact_fields: FrozenSet[str] = DEFAULT_REDACTED_FIELDS
+    trace_exporter: str = "none"
+    trace_file: str = "traces.jsonl"
+    trace_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    trace_sample_rate: float = 1.0
+    trace_slow_threshold: Optional[float] = None
+    slow_request_threshold: Optional[float] = SLACK_ACK_WINDOW_SECONDS / 2
+    slow_request_buffer: int = 100
+    admin_token: Optional[str] = None
+    admin_port: int = 8081
+    profile_dir: str = os.path.join(tempfile.gettempdir(), "jitsi-slack-profiles")
 
     @classmethod
     def from_env(cls) -> "JitsiConfiguration":
@@ -54,6 +105,7 @@ class JitsiConfiguration:
             slash_cmd=os.environ.get("SLACK_SLASH_CMD", "/jitsi"),
             metrics_port=os.environ.get("METRICS_PORT", "8080"),
             proxy_mode=os.environ.get("PROXY_MODE", "false"),
+            preload_app=os.environ.get("GUNICORN_PRELOAD_APP", "false").lower() == "true",
             vault_url=os.environ.get("VAULT_URL", None),
             vault_token=os.environ.get("VAULT_TOKEN", None),
             vault_mount_point=os.environ.get("VAULT_MOUNT_POINT", "kv"),
@@ -64,22 +116,85 @@ class JitsiConfiguration:
             db_username=os.environ.get("DB_USERNAME", None),
             db_password=os.environ.get("DB_PASSWORD", None),
             db_name=os.environ.get("DB_NAME", "jitsi-slack"),
+            storage_read_timeout=_read_timeout_from_env(),
+            storage_breaker_failures=int(os.environ.get("STORAGE_BREAKER_FAILURES", "5")),
+            storage_breaker_reset=float(os.environ.get("STORAGE_BREAKER_RESET", "30")),
+            resolved_url_ttl=float(os.environ.get("RESOLVED_URL_TTL", "30")),
+            room_name_guard=os.environ.get("ROOM_NAME_GUARD", "false").lower() == "true",
+            room_name_guard_window=float(os.environ.get("ROOM_NAME_GUARD_WINDOW", "86400")),
+            room_name_guard_capacity=int(os.environ.get("ROOM_NAME_GUARD_CAPACITY", "10000")),
+            room_name_guard_error_rate=float(os.environ.get("ROOM_NAME_GUARD_ERROR_RATE", "0.001")),
+            server_probe_interval=float(os.environ.get("SERVER_PROBE_INTERVAL", "10")),
+            server_probe_timeout=float(os.environ.get("SERVER_PROBE_TIMEOUT", "2")),
+            server_validation_timeout=float(os.environ.get("SERVER_VALIDATION_TIMEOUT", "3"))
+            or None,
+            server_validation_cache_ttl=float(os.environ.get("SERVER_VALIDATION_CACHE_TTL", "300")),
+            log_async=os.environ.get("LOG_ASYNC", "true").lower() == "true",
+            log_sample_rates=parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES")),
+            log_default_sample_rate=check_sample_rate(
+                float(os.environ.get("LOG_DEFAULT_SAMPLE_RATE", "1"))
+            ),
+            log_redact_fields=DEFAULT_REDACTED_FIELDS.union(
+                filter(
+                    None, (f.strip() for f in os.environ.get("LOG_REDACT_FIELDS", "").split(","))
+                )
+            ),
+            trace_exporter=os.environ.get("TRACE_EXPORTER", "none").lower(),
+            trace_file=os.environ.get("TRACE_FILE", "traces.jsonl"),
+            trace_otlp_endpoint=os.environ.get(
+                "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+            ),
+            trace_sample_rate=check_sample_rate(
+                float(os.environ.get("TRACE_SAMPLE_RATE", "1")), "traces"
+            ),
+            trace_slow_threshold=float(os.environ.get("TRACE_SLOW_THRESHOLD", "0")) or None,
+            slow_request_threshold=float(
+                os.environ.get("SLOW_REQUEST_THRESHOLD", SLACK_ACK_WINDOW_SECONDS / 2)
+            )
+            or None,
+            slow_request_buffer=int(os.environ.get("SLOW_REQUEST_BUFFER", "100")),
+            admin_token=os.environ.get("ADMIN_TOKEN") or None,
+            admin_port=int(os.environ.get("ADMIN_PORT", "8081")),
+            profile_dir=os.environ.get(
+                "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "jitsi-slack-profiles")
+            ),
         )
 
-        if config.data_store_provider == StorageType.VAULT:
-            if not config.vault_url or not config.vault_token:
+        if config.trace_exporter not in TRACE_EXPORTERS:
+            raise ValueError(f"Invalid trace exporter: {config.trace_exporter}")
+
+        if config.usage_log not in USAGE_SINKS:
+            raise ValueError(f"Invalid usage log: {config.usage_log}")
+        if config.usage_log == "postgres" and config.data_store_provider != StorageType.POSTGRES:
+            raise ValueError("USAGE_LOG=postgres requires the postgres storage provider")
+
+        config.check_storage(config.data_store_provider)
+        return config
+
+    def check_storage(self, provider: StorageType) -> None:
+        """Raise ValueError if the settings a storage provider needs are missing."""
+        if provider == StorageType.VAULT:
+            if not self.vault_url or not self.vault_token:
                 raise ValueError("Vault URL and token are required when using Vault storage")
 
-        if config.data_store_provider == StorageType.POSTGRES:
-            if not config.db_host or not config.db_ip:
+        if provider == StorageType.POSTGRES:
+            if not self.db_host or not self.db_ip:
                 raise ValueError("DB_HOST or DB_IP is required when using Postgres storage")
-            if not config.db_port:
+            if not self.db_port:
                 raise ValueError("DB_PORT is required when using Postgres storage")
-            if not config.db_username:
+            if not self.db_username:
                 raise ValueError("DB_USERNAME is required when using Postgres storage")
-            if not config.db_password:
+            if not self.db_password:
                 raise ValueError("DB_PASSWORD is required when using Postgres storage")
-            if not config.db_name:
+            if not self.db_name:
                 raise ValueError("DB_NAME is required when using Postgres storage")
 
-        return config
+
+def _read_timeout_from_env() -> Optional[float]:
+    """Parse STORAGE_READ_TIMEOUT in seconds; 0 disables the read deadline."""
+    timeout = float(os.environ.get("STORAGE_READ_TIMEOUT", DEFAULT_STORAGE_READ_TIMEOUT))
+    if timeout < 0 or timeout >= SLACK_ACK_WINDOW_SECONDS:
+        raise ValueError(
+            f"STORAGE_READ_TIMEOUT must be between 0 and {SLACK_ACK_WINDOW_SECONDS} seconds"
+        )
+    return timeout or None
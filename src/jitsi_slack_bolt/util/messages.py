@@ -3,23 +3,19 @@ Message block utilities for building Slack messages.
 
 This module provides functions to create message blocks for Slack messages
 used throughout the Jitsi Slack integration.
+
+Each message shape is a BlockTemplate compiled once at import time; the builders
+only fill in its slots. Returned blocks share their static parts between calls
+and must not be modified.
 """
 
+from functools import lru_cache
 from typing import Dict, Any, List
 
+from .templates import BlockTemplate, Slot
 
-def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[Dict[str, Any]]:
-    """
-    Build a Slack help message with rich text blocks showing available commands.
-
-    Args:
-        slash_cmd: The slash command name (e.g. "/jitsi")
-        default_server_url: The default Jitsi server URL
-
-    Returns:
-        List of Slack message blocks containing formatted help information
-    """
-    return [
+HELP_MESSAGE_TEMPLATE = BlockTemplate(
+    [
         {
             "type": "rich_text",
             "elements": [
@@ -28,7 +24,9 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
                     "elements": [
                         {
                             "type": "text",
-                            "text": f"Welcome to the {slash_cmd} bot! Here's what you can do:",
+                            "text": Slot(
+                                "slash_cmd", fmt="Welcome to the {} bot! Here's what you can do:"
+                            ),
                             "style": {
                                 "bold": True,
                             },
@@ -45,7 +43,7 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
                                 {
                                     "type": "text",
                                     "style": {"code": True},
-                                    "text": f"{slash_cmd}",
+                                    "text": Slot("slash_cmd"),
                                 },
                                 {
                                     "type": "text",
@@ -61,7 +59,7 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
                                     "style": {
                                         "code": True,
                                     },
-                                    "text": f"{slash_cmd} <room_name>",
+                                    "text": Slot("slash_cmd", fmt="{} <room_name>"),
                                 },
                                 {
                                     "type": "text",
@@ -77,7 +75,7 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
                                     "style": {
                                         "code": True,
                                     },
-                                    "text": f"{slash_cmd} [@user1 @user2 ...]",
+                                    "text": Slot("slash_cmd", fmt="{} [@user1 @user2 ...]"),
                                 },
                                 {
                                     "type": "text",
@@ -93,7 +91,7 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
                                     "style": {
                                         "code": True,
                                     },
-                                    "text": f"{slash_cmd} server",
+                                    "text": Slot("slash_cmd", fmt="{} server"),
                                 },
                                 {
                                     "type": "text",
@@ -109,7 +107,7 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
                                     "style": {
                                         "code": True,
                                     },
-                                    "text": f"{slash_cmd} server <url>",
+                                    "text": Slot("slash_cmd", fmt="{} server <url>"),
                                 },
                                 {
                                     "type": "text",
@@ -125,11 +123,30 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
                                     "style": {
                                         "code": True,
                                     },
-                                    "text": f"{slash_cmd} server default",
+                                    "text": Slot("slash_cmd", fmt="{} server channel <url>"),
                                 },
                                 {
                                     "type": "text",
-                                    "text": f" will set the server URL used for conferences to the default ({default_server_url}).",
+                                    "text": " sets the server used for conferences in this channel only, or with default in place of the URL removes it.",
+                                },
+                            ],
+                        },
+                        {
+                            "type": "rich_text_section",
+                            "elements": [
+                                {
+                                    "type": "text",
+                                    "style": {
+                                        "code": True,
+                                    },
+                                    "text": Slot("slash_cmd", fmt="{} server default"),
+                                },
+                                {
+                                    "type": "text",
+                                    "text": Slot(
+                                        "default_server_url",
+                                        fmt=" will set the server URL used for conferences to the default ({}).",
+                                    ),
                                 },
                             ],
                         },
@@ -138,25 +155,15 @@ def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[D
             ],
         }
     ]
+)
 
-
-def build_join_message_blocks(message: str, room_url: str) -> List[Dict[str, Any]]:
-    """
-    Build a Slack message with blocks containing a message and a join button.
-
-    Args:
-        message: The message to display in the block
-        room_url: The URL for the Jitsi meeting room
-
-    Returns:
-        List of Slack message blocks containing message and join button
-    """
-    blocks = [
+JOIN_MESSAGE_TEMPLATE = BlockTemplate(
+    [
         {
             "type": "section",
             "text": {
                 "type": "plain_text",
-                "text": f"{message}",
+                "text": Slot("message"),
             },
         },
         {
@@ -166,10 +173,41 @@ def build_join_message_blocks(message: str, room_url: str) -> List[Dict[str, Any
                     "type": "button",
                     "text": {"type": "plain_text", "text": "Click to Join"},
                     "style": "primary",
-                    "url": f"{room_url}",
+                    "url": Slot("room_url", kind="url"),
                     "action_id": "join_button",
                 }
             ],
         },
     ]
-    return blocks
+)
+
+
+@lru_cache(maxsize=64)
+def build_help_message_blocks(slash_cmd: str, default_server_url: str) -> List[Dict[str, Any]]:
+    """
+    Build a Slack help message with rich text blocks showing available commands.
+
+    The message only depends on its arguments, so it is rendered once per pair and cached.
+
+    Args:
+        slash_cmd: The slash command name (e.g. "/jitsi")
+        default_server_url: The default Jitsi server URL
+
+    Returns:
+        List of Slack message blocks containing formatted help information
+    """
+    return HELP_MESSAGE_TEMPLATE.render(slash_cmd=slash_cmd, default_server_url=default_server_url)
+
+
+def build_join_message_blocks(message: str, room_url: str) -> List[Dict[str, Any]]:
+    """
+    Build a Slack message with blocks containing a message and a join button.
+
+    Args:
+        message: The message to display in the block
+        room_url: The URL for the Jitsi meeting room
+
+    Returns:
+        List of Slack message blocks containing message and join button
+    """
+    return JOIN_MESSAGE_TEMPLATE.render(message=message, room_url=room_url)
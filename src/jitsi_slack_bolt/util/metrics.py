@@ -0,0 +1,26 @@
+"""
+Prometheus metrics shared across the Jitsi Slack integration.
+
+Metrics are defined once at module level so that every worker process writes to the same
+metric families; in gunicorn deployments they are aggregated through PROMETHEUS_MULTIPROC_DIR.
+"""
+
+from prometheus_client import Counter
+
+STORAGE_DEGRADED_READS = Counter(
+    "jitsi_slack_storage_degraded_reads_total",
+    "Storage reads answered from a fallback value instead of the provider",
+    ["provider", "reason"],
+)
+
+STORAGE_BREAKER_TRIPS = Counter(
+    "jitsi_slack_storage_breaker_trips_total",
+    "Number of times a storage provider circuit breaker opened",
+    ["provider"],
+)
+
+RESOLVED_SERVER_URL_LOOKUPS = Counter(
+    "jitsi_slack_resolved_server_url_lookups_total",
+    "Effective server URL lookups, by whether they were answered from the resolved-value cache",
+    ["result"],
+)
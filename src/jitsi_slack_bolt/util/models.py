@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, create_engine, URL
+from sqlalchemy import BigInteger, Column, DateTime, Identity, String, create_engine, URL
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -14,6 +14,19 @@ class WorkspaceData(Base):
     server_url = Column(String)
 
 
+class UsageEventData(Base):
+    """SQL model for a room created by a command."""
+
+    __tablename__ = "usage_events"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    team_id = Column(String, index=True)
+    channel_id = Column(String)
+    subcommand = Column(String)
+    server_url = Column(String)
+    created_at = Column(DateTime(timezone=True), index=True)
+
+
 def init_db(database_url: URL):
     """Initialize database and create tables if they don't exist."""
     engine = create_engine(database_url)
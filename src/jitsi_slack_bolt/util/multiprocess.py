@@ -0,0 +1,168 @@
+"""
+Compaction of the Prometheus multiprocess directory.
+
+Every gunicorn worker writes its metrics to its own files in PROMETHEUS_MULTIPROC_DIR, and a
+scrape reads and merges all of them. Files of dead workers are never removed (only their live
+gauges are), so with worker recycling every scrape gets slower the longer the server runs.
+
+MultiprocessCompactor runs in the gunicorn master and periodically folds the files of workers
+that have exited into one aggregate file per metric type, then deletes them. The master also
+serves the scrapes, so compaction and collection share a lock and a scrape never sees a worker's
+values both in its own file and in the aggregate.
+"""
+
+import glob
+import logging
+import operator
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.mmap_dict import MmapedDict
+from prometheus_client.multiprocess import MultiProcessCollector
+
+METRICS_FILES = Gauge(
+    "jitsi_slack_metrics_files",
+    "Files in the Prometheus multiprocess directory at the last scrape",
+    multiprocess_mode="mostrecent",
+)
+METRICS_SCRAPE_SECONDS = Histogram(
+    "jitsi_slack_metrics_scrape_seconds",
+    "Time taken to read and merge the Prometheus multiprocess directory",
+)
+METRICS_FILES_COMPACTED = Counter(
+    "jitsi_slack_metrics_files_compacted_total",
+    "Files of exited workers merged into the aggregate files",
+)
+
+Sample = Tuple[float, float]  # (value, timestamp)
+
+
+def _add(a: Sample, b: Sample) -> Sample:
+    return a[0] + b[0], 0.0
+
+
+def _most_recent(a: Sample, b: Sample) -> Sample:
+    return b if b[1] > a[1] else a
+
+
+# file name prefix of each metric type that can be merged, and how two samples are combined;
+# "all" gauges report a value per process and live gauges are already removed when a worker
+# exits, so those files are left alone
+COMPACTABLE: Dict[str, Callable[[Sample, Sample], Sample]] = {
+    "counter": _add,
+    "histogram": _add,
+    "summary": _add,
+    "gauge_sum": _add,
+    "gauge_min": min,
+    "gauge_max": max,
+    "gauge_mostrecent": _most_recent,
+}
+AGGREGATE = "aggregate"
+
+# held while the directory is being compacted or collected
+compaction_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def compact(path: str, dead_pids: Iterable[int]) -> int:
+    """Merge the metric files of `dead_pids` into the aggregate files and delete them.
+
+    Returns the number of files removed.
+    """
+    dead_pids = list(dead_pids)
+    removed = 0
+    with compaction_lock:
+        for prefix, combine in COMPACTABLE.items():
+            dead_files = [
+                name
+                for name in (os.path.join(path, f"{prefix}_{pid}.db") for pid in dead_pids)
+                if os.path.exists(name)
+            ]
+            if not dead_files:
+                continue
+
+            aggregate = os.path.join(path, f"{prefix}_{AGGREGATE}.db")
+            sources = ([aggregate] if os.path.exists(aggregate) else []) + dead_files
+            values = {}
+            for source in sources:
+                for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(source):
+                    sample = (value, timestamp)
+                    values[key] = combine(values[key], sample) if key in values else sample
+
+            # written beside the aggregate under a name the collector does not read, then
+            # swapped in, so a failure part way leaves the previous aggregate intact
+            pending = aggregate + ".compacting"
+            if os.path.exists(pending):
+                os.remove(pending)
+            out = MmapedDict(pending)
+            try:
+                for key, (value, timestamp) in values.items():
+                    out.write_value(key, value, timestamp)
+            finally:
+                out.close()
+            os.replace(pending, aggregate)
+
+            for name in dead_files:
+                os.remove(name)
+            removed += len(dead_files)
+    METRICS_FILES_COMPACTED.inc(removed)
+    return removed
+
+
+class CompactingMultiProcessCollector(MultiProcessCollector):
+    """MultiProcessCollector that does not read the directory while it is being compacted.
+
+    Also reports the scrape duration and the number of files read.
+    """
+
+    def collect(self):
+        start = time.perf_counter()
+        with compaction_lock:
+            files = glob.glob(os.path.join(self._path, "*.db"))
+            metrics = self.merge(files, accumulate=True)
+        METRICS_FILES.set(len(files))
+        METRICS_SCRAPE_SECONDS.observe(time.perf_counter() - start)
+        return metrics
+
+
+class MultiprocessCompactor:
+    """Compacts the files of exited workers every `interval` seconds on a background thread."""
+
+    def __init__(self, path: str, interval: float = 300.0):
+        self.path = path
+        self.interval = interval
+        self._dead_pids: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def mark_dead(self, pid: int) -> None:
+        """Queue the files of an exited worker for the next compaction."""
+        with self._lock:
+            self._dead_pids.add(pid)
+
+    def run_once(self) -> int:
+        with self._lock:
+            dead_pids: List[int] = sorted(self._dead_pids)
+            self._dead_pids.clear()
+        if not dead_pids:
+            return 0
+        try:
+            removed = compact(self.path, dead_pids)
+        except Exception:
+            logger.exception("failed to compact prometheus multiprocess files")
+            with self._lock:
+                self._dead_pids.update(dead_pids)
+            return 0
+        logger.info(f"compacted {removed} metric files of {len(dead_pids)} exited workers")
+        return removed
+
+    def start(self) -> None:
+        threading.Thread(target=self._run, name="metrics-compactor", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.run_once()
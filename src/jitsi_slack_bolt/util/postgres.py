@@ -1,8 +1,11 @@
-from typing import Optional
-from sqlalchemy import URL
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import URL, func, insert
+from sqlalchemy.dialects.postgresql import insert as upsert
 from sqlalchemy.orm import Session
-from .store import StorageProvider
-from .models import WorkspaceData, init_db
+from .store import StorageProvider, WorkspaceRecord
+from .models import UsageEventData, WorkspaceData, init_db
+from .usage import UsageEvent
 
 
 class PostgresStorageProvider(StorageProvider):
@@ -40,6 +43,10 @@ class PostgresStorageProvider(StorageProvider):
 
         self.engine = init_db(url_object)
 
+    def reset_after_fork(self) -> None:
+        # keep the parent's pooled connections open for the parent, but never reuse them here
+        self.engine.dispose(close=False)
+
     def get_oauth(self, workspace_id: str) -> Optional[str]:
         with Session(self.engine) as session:
             workspace = session.query(WorkspaceData).get(workspace_id)
@@ -59,6 +66,14 @@ class PostgresStorageProvider(StorageProvider):
             workspace = session.query(WorkspaceData).get(workspace_id)
             return workspace.server_url if workspace else None
 
+    def get_server_urls(self, workspace_ids: Sequence[str]) -> Dict[str, Optional[str]]:
+        with Session(self.engine) as session:
+            rows = session.query(WorkspaceData.workspace_id, WorkspaceData.server_url).filter(
+                WorkspaceData.workspace_id.in_(workspace_ids)
+            )
+            server_urls = dict(rows)
+        return {workspace_id: server_urls.get(workspace_id) for workspace_id in workspace_ids}
+
     def set_server_url(self, workspace_id: str, server_url: str) -> None:
         with Session(self.engine) as session:
             workspace = session.query(WorkspaceData).get(workspace_id)
@@ -75,3 +90,77 @@ class PostgresStorageProvider(StorageProvider):
             if workspace:
                 session.delete(workspace)
                 session.commit()
+
+    def list_workspaces(self, after: Optional[str] = None, limit: int = 1000) -> List[str]:
+        with Session(self.engine) as session:
+            query = session.query(WorkspaceData.workspace_id)
+            if after is not None:
+                query = query.filter(WorkspaceData.workspace_id > after)
+            return [row[0] for row in query.order_by(WorkspaceData.workspace_id).limit(limit)]
+
+    def get_workspaces(self, workspace_ids: Sequence[str]) -> List[WorkspaceRecord]:
+        with Session(self.engine) as session:
+            rows = session.query(WorkspaceData).filter(
+                WorkspaceData.workspace_id.in_(workspace_ids)
+            )
+            found = {row.workspace_id: row for row in rows}
+        return [
+            WorkspaceRecord(
+                workspace_id,
+                found[workspace_id].oauth_token if workspace_id in found else None,
+                found[workspace_id].server_url if workspace_id in found else None,
+            )
+            for workspace_id in workspace_ids
+        ]
+
+    def set_workspaces(self, records: Sequence[WorkspaceRecord]) -> None:
+        """Upsert several records in one statement; values that are None are left as they are."""
+        if not records:
+            return
+        statement = upsert(WorkspaceData).values(
+            [
+                {
+                    "workspace_id": record.workspace_id,
+                    "oauth_token": record.oauth_token,
+                    "server_url": record.server_url,
+                }
+                for record in records
+            ]
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[WorkspaceData.workspace_id],
+            set_={
+                "oauth_token": func.coalesce(
+                    statement.excluded.oauth_token, WorkspaceData.oauth_token
+                ),
+                "server_url": func.coalesce(
+                    statement.excluded.server_url, WorkspaceData.server_url
+                ),
+            },
+        )
+        with Session(self.engine) as session:
+            session.execute(statement)
+            session.commit()
+
+
+class PostgresUsageSink:
+    """Writes usage event batches to the usage_events table with one multi-row INSERT."""
+
+    def __init__(self, provider: PostgresStorageProvider):
+        # the provider's engine is reset in forked workers, so it is looked up on every write
+        self.provider = provider
+
+    def write(self, events: List[UsageEvent]) -> None:
+        rows = [
+            {
+                "team_id": event.team_id,
+                "channel_id": event.channel_id,
+                "subcommand": event.subcommand,
+                "server_url": event.server_url,
+                "created_at": datetime.fromtimestamp(event.timestamp, timezone.utc),
+            }
+            for event in events
+        ]
+        with Session(self.provider.engine) as session:
+            session.execute(insert(UsageEventData), rows)
+            session.commit()
@@ -0,0 +1,205 @@
+"""
+Jitsi Server Pools
+
+A server URL setting may name a pool of servers separated by spaces. Rooms are created on the
+healthiest member of the pool: a background prober requests every pool member at a fixed
+interval, records whether it answered and how long it took, and after each round recomputes the
+best member of every pool. Choosing a server is then a single dictionary lookup on the command
+path, with no network call.
+
+Servers that did not answer rank after those that did, and otherwise servers rank by their
+smoothed response time. Until a pool has been probed its first member is used, so a pool behaves
+like a single URL when no prober is installed with set_server_prober().
+"""
+
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+SERVER_UP = Gauge(
+    "jitsi_slack_server_up",
+    "Whether the last probe of a pooled Jitsi server succeeded",
+    ["server"],
+    multiprocess_mode="mostrecent",
+)
+SERVER_PROBE_SECONDS = Gauge(
+    "jitsi_slack_server_probe_seconds",
+    "Smoothed response time of a pooled Jitsi server's probes",
+    ["server"],
+    multiprocess_mode="mostrecent",
+)
+SERVER_SELECTIONS = Counter(
+    "jitsi_slack_server_selections_total",
+    "Rooms created on each member of a server pool",
+    ["server"],
+)
+
+Pool = Tuple[str, ...]
+
+
+def parse_pool(server_url: Optional[str]) -> Pool:
+    """Split a server URL setting into the servers of its pool."""
+    return tuple(server_url.split()) if server_url else ()
+
+
+def http_probe(server_url: str, timeout: float) -> bool:
+    """Request `server_url`; a server is up if it answers without a server error."""
+    try:
+        with urllib.request.urlopen(server_url, timeout=timeout) as response:
+            return response.status < 500
+    except urllib.error.HTTPError as e:
+        return e.code < 500
+    except (OSError, ValueError):
+        return False
+
+
+class _ServerHealth:
+    """Probe results of one server."""
+
+    __slots__ = ("up", "latency")
+
+    def __init__(self):
+        self.up: Optional[bool] = None
+        self.latency: Optional[float] = None
+
+
+class ServerProber:
+    """Probes the members of server pools and ranks them.
+
+    Args:
+        interval: seconds between probe rounds
+        timeout: seconds a probe may take before the server counts as down
+        smoothing: weight of the newest response time in the moving average
+        max_pools: pools tracked at once; the least recently used is forgotten first
+        probe: called with a server URL and the timeout; returns whether the server is up
+    """
+
+    def __init__(
+        self,
+        interval: float = 10.0,
+        timeout: float = 2.0,
+        smoothing: float = 0.3,
+        max_pools: int = 100,
+        probe: Callable[[str, float], bool] = http_probe,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.smoothing = smoothing
+        self.max_pools = max_pools
+        self._probe = probe
+        self._clock = clock
+        self._pools: OrderedDict[Pool, None] = OrderedDict()
+        self._health: Dict[str, _ServerHealth] = {}
+        # best member of every pool, replaced as a whole after each round so that lookups need
+        # no lock
+        self._best: Dict[Pool, str] = {}
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    def choose(self, pool: Pool) -> str:
+        """Return the best ranked member of a pool."""
+        server_url = self._best.get(pool)
+        if server_url is None:
+            self._register(pool)
+            server_url = pool[0]
+        SERVER_SELECTIONS.labels(server=server_url).inc()
+        return server_url
+
+    def _register(self, pool: Pool) -> None:
+        self._ensure_thread()
+        with self._lock:
+            self._pools[pool] = None
+            self._pools.move_to_end(pool)
+            if len(self._pools) > self.max_pools:
+                self._pools.popitem(last=False)
+
+    def _probe_one(self, server_url: str) -> Tuple[bool, float]:
+        start = self._clock()
+        up = self._probe(server_url, self.timeout)
+        return up, self._clock() - start
+
+    def probe_once(self) -> None:
+        """Probe every pooled server once and recompute the rankings."""
+        with self._lock:
+            pools = list(self._pools)
+        servers = sorted({server_url for pool in pools for server_url in pool})
+        if not servers:
+            return
+        with ThreadPoolExecutor(max_workers=min(len(servers), 8)) as executor:
+            results = dict(zip(servers, executor.map(self._probe_one, servers)))
+
+        with self._lock:
+            self._health = {s: self._health.get(s) or _ServerHealth() for s in servers}
+            for server_url, (up, elapsed) in results.items():
+                health = self._health[server_url]
+                health.up = up
+                if up:
+                    health.latency = (
+                        elapsed
+                        if health.latency is None
+                        else self.smoothing * elapsed + (1 - self.smoothing) * health.latency
+                    )
+                    SERVER_PROBE_SECONDS.labels(server=server_url).set(health.latency)
+                SERVER_UP.labels(server=server_url).set(1 if up else 0)
+            self._best = {pool: min(pool, key=self._rank) for pool in self._pools}
+
+    def _rank(self, server_url: str) -> Tuple[int, float]:
+        health = self._health.get(server_url)
+        if health is None or not health.up:
+            return 1, 0.0
+        return 0, health.latency
+
+    def ranking(self, pool: Pool) -> Tuple[str, ...]:
+        """Return a pool's members from best to worst, as of the last probe round."""
+        with self._lock:
+            return tuple(sorted(pool, key=self._rank))
+
+    def health(self) -> Dict[str, Dict[str, object]]:
+        """Report the last probe result of every pooled server."""
+        with self._lock:
+            return {s: {"up": h.up, "latency": h.latency} for s, h in self._health.items()}
+
+    def _ensure_thread(self) -> None:
+        # threads do not survive a fork, so each worker probes for itself
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                threading.Thread(target=self._run, name="server-prober", daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            self.probe_once()
+            time.sleep(self.interval)
+
+
+_server_prober: Optional[ServerProber] = None
+
+
+def set_server_prober(prober: Optional[ServerProber]) -> None:
+    """Install (or with None, remove) the prober used by choose_server."""
+    global _server_prober
+    _server_prober = prober
+
+
+def get_server_prober() -> Optional[ServerProber]:
+    return _server_prober
+
+
+def choose_server(server_url: Optional[str]) -> Optional[str]:
+    """Return the server to create a room on for a server URL setting, which may be a pool."""
+    pool = parse_pool(server_url)
+    if len(pool) <= 1:
+        return pool[0] if pool else server_url
+    if _server_prober is None:
+        return pool[0]
+    return _server_prober.choose(pool)
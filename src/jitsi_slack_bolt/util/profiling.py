@@ -0,0 +1,186 @@
+"""
+On-demand CPU and memory profiling of a running worker.
+
+- StackSampler samples the stacks of every other thread at a fixed interval for a bounded time
+  and writes them in the collapsed format read by flamegraph.pl and speedscope
+- HeapTracker starts tracemalloc on request and reports the allocation sites that grew the
+  most since the previous snapshot
+
+Both only cost anything while a profile is being taken.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_PROFILE_SECONDS = 60.0
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+def collapse_stack(frame, thread_name: str) -> str:
+    """Render a frame and its callers as "thread;outermost;...;innermost"."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Statistical profiler sampling the stacks of all other threads in this process.
+
+    A profile runs on its own thread so the worker keeps serving requests (and is sampled doing
+    so). Finished profiles are written to `output_dir` as profile-<pid>.collapsed, so any worker
+    can return the profile taken by another.
+    """
+
+    def __init__(self, output_dir: str, max_seconds: float = MAX_PROFILE_SECONDS):
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def path_for(self, pid: int) -> str:
+        return os.path.join(self.output_dir, f"profile-{pid}.collapsed")
+
+    def start(self, seconds: float, interval: float = 0.005) -> float:
+        """Start sampling in the background; returns the capped duration in seconds."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("a profile is already running in this process")
+        seconds = min(max(seconds, interval), self.max_seconds)
+        threading.Thread(
+            target=self._run, args=(seconds, interval), name="stack-sampler", daemon=True
+        ).start()
+        return seconds
+
+    def _run(self, seconds: float, interval: float) -> None:
+        try:
+            stacks = self.sample(seconds, interval)
+            os.makedirs(self.output_dir, exist_ok=True)
+            path = self.path_for(os.getpid())
+            with open(path + ".tmp", "w", encoding="utf-8") as out:
+                out.write(format_collapsed(stacks))
+            os.replace(path + ".tmp", path)
+        finally:
+            self._lock.release()
+
+    @staticmethod
+    def sample(seconds: float, interval: float = 0.005) -> Counter:
+        """Sample for `seconds` on the calling thread and count each collapsed stack seen."""
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    stacks[collapse_stack(frame, names.get(ident, str(ident)))] += 1
+            time.sleep(interval)
+        return stacks
+
+    def latest(self, pid: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """Return (pid, collapsed stacks) of the given worker's or the most recent profile."""
+        if pid is not None:
+            paths = [self.path_for(pid)]
+        else:
+            try:
+                paths = [
+                    os.path.join(self.output_dir, name)
+                    for name in os.listdir(self.output_dir)
+                    if name.startswith("profile-") and name.endswith(".collapsed")
+                ]
+            except FileNotFoundError:
+                return None
+            paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    return int(os.path.basename(path).split("-")[1].split(".")[0]), f.read()
+            except FileNotFoundError:
+                continue
+        return None
+
+
+def format_collapsed(stacks: Counter) -> str:
+    """Render stack counts as "frame;frame;frame count" lines, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class HeapTracker:
+    """Tracks allocation growth between tracemalloc snapshots."""
+
+    def __init__(self):
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = 1) -> None:
+        """Start tracing allocations, keeping `frames` frames of traceback per allocation."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self._baseline = self._snapshot()
+
+    def stop(self) -> None:
+        with self._lock:
+            tracemalloc.stop()
+            self._baseline = None
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),)
+        )
+
+    def diff(self, top: int = 25, key_type: str = "lineno") -> Dict[str, Any]:
+        """Report the `top` allocation sites by growth since the last snapshot.
+
+        The new snapshot becomes the baseline for the next call. Tracing is started if it is not
+        already running, in which case the first report only covers the time since then.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            snapshot = self._snapshot()
+            baseline, self._baseline = self._baseline, snapshot
+        if baseline is None:
+            stats = snapshot.statistics(key_type)
+            growth: List[Dict[str, Any]] = [
+                {"site": str(stat.traceback), "size": stat.size, "count": stat.count}
+                for stat in stats[:top]
+            ]
+        else:
+            stats = snapshot.compare_to(baseline, key_type)
+            growth = [
+                {
+                    "site": str(stat.traceback),
+                    "size": stat.size,
+                    "size_diff": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:top]
+            ]
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "pid": os.getpid(),
+            "traced_bytes": current,
+            "peak_traced_bytes": peak,
+            "compared_to_baseline": baseline is not None,
+            "top": growth,
+        }
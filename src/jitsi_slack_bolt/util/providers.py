@@ -0,0 +1,36 @@
+"""
+Construction of the configured storage provider.
+
+Each provider pulls in its own client library (hvac, sqlalchemy and psycopg2), so it is only
+imported when selected.
+"""
+
+from .config import JitsiConfiguration, StorageType
+from .store import InMemoryStorageProvider, StorageProvider
+
+
+def create_storage_provider(config: JitsiConfiguration, provider: StorageType) -> StorageProvider:
+    """Create a storage provider of the given type from the configuration."""
+    if provider == StorageType.MEMORY:
+        return InMemoryStorageProvider()
+    if provider == StorageType.VAULT:
+        from .vault import VaultStorageProvider
+
+        return VaultStorageProvider(
+            url=config.vault_url,
+            token=config.vault_token,
+            mount_point=config.vault_mount_point,
+            path_prefix=config.vault_path_prefix,
+        )
+    if provider == StorageType.POSTGRES:
+        from .postgres import PostgresStorageProvider
+
+        return PostgresStorageProvider(
+            host=config.db_host,
+            ip=config.db_ip,
+            port=config.db_port,
+            username=config.db_username,
+            password=config.db_password,
+            database_name=config.db_name,
+        )
+    raise ValueError(f"Invalid storage provider: {provider}")
@@ -0,0 +1,139 @@
+"""
+Request logging utilities for the Jitsi Slack integration.
+
+Request payloads are only formatted when a DEBUG record is actually emitted:
+RequestLogger checks the level and a per-route sample rate first, and hands the
+payload to logging as a lazily rendered, redacted argument. Records can be
+passed to the real handlers by a background thread (see start_queued_logging)
+so that writing logs never blocks a request.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+DEFAULT_REDACTED_FIELDS = frozenset(
+    {
+        "token",
+        "bot_token",
+        "access_token",
+        "client_secret",
+        "code",
+        "response_url",
+        "trigger_id",
+    }
+)
+
+REDACTED = "[redacted]"
+
+
+def redact(payload: Any, fields: FrozenSet[str]) -> Any:
+    """Return a copy of `payload` with the values of any key in `fields` replaced."""
+    if isinstance(payload, dict):
+        return {
+            key: REDACTED if key in fields else redact(value, fields)
+            for key, value in payload.items()
+        }
+    if isinstance(payload, list):
+        return [redact(item, fields) for item in payload]
+    return payload
+
+
+class LazyPayload:
+    """Log argument that redacts and serializes its payload only when the record is formatted."""
+
+    __slots__ = ("payload", "fields")
+
+    def __init__(self, payload: Any, fields: FrozenSet[str]):
+        self.payload = payload
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return json.dumps(redact(self.payload, self.fields), default=str, sort_keys=True)
+
+
+def parse_sample_rates(spec: Optional[str]) -> Dict[str, float]:
+    """Parse "route=rate,route=rate" into a dict, e.g. "slack_events=0.1,health=0"."""
+    rates = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        route, sep, rate = entry.partition("=")
+        if not sep:
+            raise ValueError(f"invalid sample rate {entry!r}; expected route=rate")
+        rates[route.strip()] = check_sample_rate(float(rate), route.strip())
+    return rates
+
+
+def check_sample_rate(rate: float, route: str = "default") -> float:
+    if not 0 <= rate <= 1:
+        raise ValueError(f"sample rate for {route} must be between 0 and 1")
+    return rate
+
+
+class RequestLogger:
+    """Logs request payloads at DEBUG level, sampled per route and with sensitive fields redacted.
+
+    Args:
+        logger: logger records are written to
+        sample_rates: fraction of requests logged per route; routes not listed use default_rate
+        default_rate: fraction of requests logged for routes without their own rate
+        redact_fields: payload keys whose values are never logged
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample_rates: Optional[Dict[str, float]] = None,
+        default_rate: float = 1.0,
+        redact_fields: Iterable[str] = DEFAULT_REDACTED_FIELDS,
+    ):
+        self.logger = logger
+        self.sample_rates = dict(sample_rates or {})
+        self.default_rate = default_rate
+        self.redact_fields = frozenset(redact_fields)
+
+    def log(self, route: str, message: str, *args: Any, payload: Any = None) -> None:
+        """Log `message % args` (and `payload`, if given) for a request on `route`."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        rate = self.sample_rates.get(route, self.default_rate)
+        if rate < 1 and random.random() >= rate:
+            return
+        if payload is not None:
+            message += " %s"
+            args += (LazyPayload(payload, self.redact_fields),)
+        self.logger.debug(f"{route}: {message}", *args, extra={"route": route})
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock QueueHandler formats each record before enqueueing it, which would render lazy
+    payloads on the request thread. Records are only shared within this process, so they can be
+    queued as they are.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def start_queued_logging(
+    logger: Optional[logging.Logger] = None,
+) -> logging.handlers.QueueListener:
+    """Route `logger`'s handlers (the root logger by default) through a queue.
+
+    The logger's current handlers are moved onto a QueueListener thread and replaced by a single
+    QueueHandler, so emitting a record only enqueues it. Threads do not survive a fork, so this
+    must be called in each worker process. Stop the returned listener to flush pending records.
+    """
+    logger = logger or logging.getLogger()
+    handlers = [h for h in logger.handlers if not isinstance(h, logging.handlers.QueueHandler)]
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+    logger.addHandler(DeferredQueueHandler(records))
+    listener.start()
+    return listener
@@ -0,0 +1,126 @@
+"""
+Resilience helpers for calls to slow or unreliable backends.
+
+This module provides a circuit breaker and a deadline executor that let the
+command path give up on a stalled storage provider instead of blocking until
+Slack's acknowledgement window has passed.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not complete within its deadline."""
+
+
+class CircuitBreaker:
+    """Tracks consecutive failures of a backend and short-circuits calls while it is unhealthy.
+
+    The breaker opens after `failure_threshold` consecutive failures. While open, calls are
+    rejected until `reset_timeout` seconds have passed, after which a single trial call is
+    allowed through (half-open). A successful trial closes the breaker again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        on_open: Optional[Callable[[], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._on_open = on_open
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Return True if a call to the backend should be attempted."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            was_half_open = self._trial_in_flight
+            self._trial_in_flight = False
+            if was_half_open or (
+                self._opened_at is None and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = self._clock()
+                opened = True
+            else:
+                opened = False
+        if opened and self._on_open is not None:
+            self._on_open()
+
+
+class DeadlineExecutor:
+    """Runs callables on a small thread pool and stops waiting for them after a deadline.
+
+    A call that exceeds its deadline keeps running in the background, but the caller is released
+    immediately. The pool is created lazily so that an executor built before a fork does not
+    carry dead threads into the child process.
+    """
+
+    def __init__(self, max_workers: int = 4, thread_name_prefix: str = "deadline"):
+        self._max_workers = max_workers
+        self._thread_name_prefix = thread_name_prefix
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix=self._thread_name_prefix
+                )
+            return self._pool
+
+    def call(self, fn: Callable[..., Any], *args: Any, timeout: float) -> Any:
+        """Call `fn(*args)` and return its result, raising DeadlineExceeded after `timeout`."""
+        future = self._get_pool().submit(fn, *args)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceeded(f"call to {getattr(fn, '__name__', fn)} exceeded {timeout}s")
+
+    def reset(self) -> None:
+        """Drop the current pool; used in a freshly forked process."""
+        with self._lock:
+            self._pool = None
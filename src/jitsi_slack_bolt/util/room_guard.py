@@ -0,0 +1,197 @@
+"""
+Room Name Uniqueness Guard
+
+This module remembers recently issued room names per Jitsi server so that two
+channels are not handed the same random room on the same server.
+
+Names are tracked in a RotatingBloomFilter: two Bloom filter generations that
+each cover half of the configured window, so memory stays fixed no matter how
+many rooms are created. A false positive only costs an extra draw from the
+generator, never a duplicate room.
+
+The guard is per process and needs no storage round trip; it is disabled until
+set_room_name_guard() installs one.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from prometheus_client import Counter, Gauge
+
+from .room_name import generate_room_name
+
+ROOM_NAMES_ISSUED = Counter(
+    "jitsi_slack_room_names_issued_total", "Random room names issued through the uniqueness guard"
+)
+ROOM_NAME_COLLISIONS = Counter(
+    "jitsi_slack_room_name_collisions_total",
+    "Generated room names rejected because they were recently issued on the same server",
+)
+ROOM_GUARD_MEMORY = Gauge(
+    "jitsi_slack_room_guard_memory_bytes",
+    "Memory used by the room name uniqueness guard's filters",
+    multiprocess_mode="livesum",
+)
+
+
+class RotatingBloomFilter:
+    """Bloom filter over a sliding time window.
+
+    Items are added to the current generation and looked up in both the current and the
+    previous one. Every `window / 2` seconds the previous generation is dropped, so an item is
+    remembered for between half a window and a full window after it was added.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        error_rate: float,
+        window: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        # a lookup checks two generations, so give each half of the false positive budget
+        per_generation = error_rate / 2
+        self.num_bits = math.ceil(-capacity * math.log(per_generation) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._rotate_every = window / 2
+        self._clock = clock
+        self._current = bytearray((self.num_bits + 7) // 8)
+        self._previous = bytearray(len(self._current))
+        self._rotated_at = clock()
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._current) + len(self._previous)
+
+    def _rotate(self) -> None:
+        elapsed = self._clock() - self._rotated_at
+        if elapsed < self._rotate_every:
+            return
+        if elapsed >= 2 * self._rotate_every:
+            self._previous = bytearray(len(self._current))
+        else:
+            self._previous = self._current
+        self._current = bytearray(len(self._previous))
+        self._rotated_at = self._clock()
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _has_all(bits: bytearray, positions) -> bool:
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def __contains__(self, item: str) -> bool:
+        self._rotate()
+        positions = self._positions(item)
+        return self._has_all(self._current, positions) or self._has_all(self._previous, positions)
+
+    def add(self, item: str) -> None:
+        self._rotate()
+        for p in self._positions(item):
+            self._current[p >> 3] |= 1 << (p & 7)
+
+
+class RoomNameGuard:
+    """Issues random room names that were not handed out recently on the same server."""
+
+    def __init__(
+        self,
+        window: float = 86400,
+        capacity: int = 10000,
+        error_rate: float = 0.001,
+        max_attempts: int = 5,
+        max_servers: int = 100,
+        generate: Callable[[], str] = generate_room_name,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the guard.
+
+        Args:
+            window: seconds a name is remembered for (at least half of this, at most all of it)
+            capacity: names per server per half window the filters are sized for
+            error_rate: target false positive rate at capacity
+            max_attempts: names drawn before giving up and issuing the last one
+            max_servers: servers tracked at once; the least recently used is forgotten first
+            generate: room name generator
+        """
+        self.window = window
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.max_attempts = max_attempts
+        self.max_servers = max_servers
+        self._generate = generate
+        self._clock = clock
+        self._filters: OrderedDict[str, RotatingBloomFilter] = OrderedDict()
+        self._lock = threading.Lock()
+        self.issued = 0
+        self.collisions = 0
+
+    def _filter_for(self, server_url: str) -> RotatingBloomFilter:
+        seen = self._filters.get(server_url)
+        if seen is None:
+            seen = RotatingBloomFilter(self.capacity, self.error_rate, self.window, self._clock)
+            self._filters[server_url] = seen
+            if len(self._filters) > self.max_servers:
+                self._filters.popitem(last=False)
+            ROOM_GUARD_MEMORY.set(self.memory_bytes)
+        self._filters.move_to_end(server_url)
+        return seen
+
+    def issue(self, server_url: str) -> str:
+        """Return a random room name not recently issued for `server_url`."""
+        with self._lock:
+            seen = self._filter_for(server_url)
+            for _ in range(self.max_attempts):
+                room_name = self._generate()
+                if room_name not in seen:
+                    break
+                self.collisions += 1
+                ROOM_NAME_COLLISIONS.inc()
+            seen.add(room_name)
+            self.issued += 1
+        ROOM_NAMES_ISSUED.inc()
+        return room_name
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(seen.memory_bytes for seen in self._filters.values())
+
+    def stats(self) -> Dict[str, float]:
+        """Report issued names, collision rate and filter memory for this process."""
+        with self._lock:
+            return {
+                "issued": self.issued,
+                "collisions": self.collisions,
+                "collision_rate": self.collisions / self.issued if self.issued else 0.0,
+                "servers": len(self._filters),
+                "memory_bytes": self.memory_bytes,
+            }
+
+
+_room_name_guard: Optional[RoomNameGuard] = None
+
+
+def set_room_name_guard(guard: Optional[RoomNameGuard]) -> None:
+    """Install (or with None, remove) the guard used by issue_room_name."""
+    global _room_name_guard
+    _room_name_guard = guard
+
+
+def issue_room_name(server_url: str) -> str:
+    """Generate a random room name for `server_url`, deduplicated if a guard is installed."""
+    if _room_name_guard is None:
+        return generate_room_name()
+    return _room_name_guard.issue(server_url)
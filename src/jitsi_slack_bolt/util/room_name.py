@@ -1,5 +1,3 @@
-import random
-
 """
 Room Name Generator
 
@@ -13,15 +11,60 @@ Contains the following lists:
 - ADVERBS: List of adverbs
 - ADJECTIVES: List of adjectives
 
+Each list is stored as a WordList, which packs its words into a single string
+with an offset table instead of keeping one string object per word.
+
+Word choices are drawn from os.urandom rather than the random module, so room
+names cannot be predicted from previously generated ones.
+
 Functions:
   generate_room_name() -> str:
     Generates and returns a random room name by combining one word from each list
+  generate_room_names(n) -> List[str]:
+    Generates n random room names, drawing the randomness for all of them at once
 
 Returns:
   str: A room name string combining an adjective, plural noun, verb and adverb
 """
+
+import os
+from array import array
+from typing import Iterable, Iterator, List
+
+
+class WordList:
+    """An immutable sequence of words packed into one string and an array of offsets."""
+
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, words: Iterable[str]):
+        words = list(words)
+        self._blob = "".join(words)
+        self._offsets = array("I", [0])
+        for word in words:
+            self._offsets.append(self._offsets[-1] + len(word))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("WordList index out of range")
+        return self._blob[self._offsets[index] : self._offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        offsets = self._offsets
+        for i in range(len(self)):
+            yield self._blob[offsets[i] : offsets[i + 1]]
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self._blob.__sizeof__() + self._offsets.__sizeof__()
+
+
 # fmt: off
-PLURAL_NOUNS = [
+PLURAL_NOUNS = WordList([
     'Abilities', 'Absences', 'Abundances', 'Academics', 'Academies', 'Accents', 'Acceptances',
     'Accesses', 'Accidents', 'Accommodations', 'Accomplishments', 'Accordances', 'Accountabilities',
     'Accountants', 'Accounts', 'Accumulations', 'Accuracies', 'Accusations', 'Accused',
@@ -391,9 +434,9 @@ PLURAL_NOUNS = [
     'Workforces', 'Workouts', 'Workplaces', 'Works', 'Workshops', 'Worlds', 'Worms', 'Worries',
     'Worses', 'Worships', 'Worsts', 'Worths', 'Wounds', 'Wrists', 'Writers', 'Writings', 'Wrongs',
     'Yards', 'Years', 'Yellows', 'Yesterdays', 'Yields', 'Zones'
-]
+])
 
-VERBS = [
+VERBS = WordList([
     'Abolish', 'Absorb', 'Accelerate', 'Accept', 'Access', 'Accommodate', 'Accompany', 'Accomplish',
     'Account', 'Accumulate', 'Accuse', 'Achieve', 'Acknowledge', 'Acquire', 'Act', 'Activate',
     'Adapt', 'Add', 'Address', 'Adhere', 'Adjust', 'Administer', 'Admire', 'Admit', 'Adopt',
@@ -525,9 +568,9 @@ VERBS = [
     'Wave', 'Weaken', 'Wear', 'Weave', 'Weigh', 'Welcome', 'Whip', 'Whisper', 'Widen', 'Win',
     'Wind', 'Wipe', 'Wish', 'Withdraw', 'Witness', 'Wonder', 'Work', 'Worry', 'Worship', 'Wound',
     'Wrap', 'Write', 'Yell', 'Yield'
-]
+])
 
-ADVERBS = [
+ADVERBS = WordList([
     'About', 'Above', 'Abroad', 'Absently', 'Absolutely', 'Accidentally', 'Accordingly',
     'Accurately', 'Accusingly', 'Across', 'Actually', 'Additionally', 'Adequately', 'Adorably',
     'After', 'Afterwards', 'Again', 'Ago', 'Ahead', 'Alike', 'All', 'Allegedly', 'AllTheTime',
@@ -587,9 +630,9 @@ ADVERBS = [
     'Weakly', 'Wearily', 'Weekly', 'Weirdly', 'Well', 'West', 'Whatever', 'Whatsoever', 'When',
     'Where', 'Whereby', 'Wholly', 'Why', 'Wickedly', 'Widely', 'Wildly', 'Wisely', 'Wonderfully',
     'Worldwide', 'Worse', 'Worst', 'Wrong', 'Yearly', 'Yesterday', 'Yet'
-]
+])
 
-ADJECTIVES = [
+ADJECTIVES = WordList([
     'Able', 'Absent', 'Absolute', 'Abstract', 'Absurd', 'Academic', 'Acceptable', 'Accessible',
     'Accountable', 'Accurate', 'Acid', 'Active', 'Actual', 'Acute', 'Additional', 'Adequate',
     'Adjacent', 'Administrative', 'Adult', 'Advance', 'Advanced', 'Adverse', 'Aesthetic',
@@ -717,16 +760,38 @@ ADJECTIVES = [
     'Waste', 'Weak', 'Wealthy', 'Weekly', 'Weird', 'Welcome', 'Well', 'West', 'Western', 'Wet',
     'Whole', 'Wide', 'Widespread', 'Wild', 'Willing', 'Wise', 'Wonderful', 'Wooden', 'Working',
     'Worldwide', 'Worried', 'Worse', 'Worst', 'Worth', 'Worthwhile', 'Worthy', 'Written', 'Wrong'
-]
+])
 # fmt: on
 
 
-def generate_room_name():
+# word lists in room name order: adjective, plural noun, verb, adverb
+_PARTS = (ADJECTIVES, PLURAL_NOUNS, VERBS, ADVERBS)
+
+
+def generate_room_names(n: int) -> List[str]:
+    """generates n room names, each with a randomized adjective, noun, verb, and adverb"""
+    if n <= 0:
+        return []
+
+    # one os.urandom read covers every word choice in the batch; each 64-bit value is mapped
+    # onto a list index with a multiply-shift, whose bias (< list size / 2**64) is negligible
+    draws = array("Q")
+    draws.frombytes(os.urandom(draws.itemsize * len(_PARTS) * n))
+
+    # pick every name's word from one list at a time, then stitch the columns together
+    columns = []
+    for position, part in enumerate(_PARTS):
+        blob, offsets, size = part._blob, part._offsets, len(part)
+        indexes = [(draw * size) >> 64 for draw in draws[position :: len(_PARTS)]]
+        columns.append([blob[offsets[i] : offsets[i + 1]] for i in indexes])
+    return [a + n + v + d for a, n, v, d in zip(*columns)]
+
+
+def generate_room_name() -> str:
     """generates a room name with a randomized adjective, noun, verb, and adverb"""
-    room_name = (
-        random.choice(ADJECTIVES)
-        + random.choice(PLURAL_NOUNS)
-        + random.choice(VERBS)
-        + random.choice(ADVERBS)
-    )
-    return room_name
+    # same draw as generate_room_names, without the batch bookkeeping for a single name
+    words = []
+    for part, draw in zip(_PARTS, array("Q", os.urandom(8 * len(_PARTS)))):
+        index = (draw * len(part)) >> 64
+        words.append(part._blob[part._offsets[index] : part._offsets[index + 1]])
+    return "".join(words)
@@ -1,5 +1,21 @@
+import bisect
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Dict, List, NamedTuple, Sequence, Set, Tuple
+
+from .metrics import RESOLVED_SERVER_URL_LOOKUPS, STORAGE_BREAKER_TRIPS, STORAGE_DEGRADED_READS
+from .resilience import CircuitBreaker, DeadlineExceeded, DeadlineExecutor
+from .tracing import annotate, traced
+
+
+class WorkspaceRecord(NamedTuple):
+    """Everything stored for one key (a team, channel or Enterprise Grid organization)."""
+
+    workspace_id: str
+    oauth_token: Optional[str]
+    server_url: Optional[str]
 
 
 class StorageProvider(ABC):
@@ -26,6 +42,35 @@ class StorageProvider(ABC):
         """Delete all data for a workspace."""
         pass
 
+    def get_server_urls(self, workspace_ids: Sequence[str]) -> Dict[str, Optional[str]]:
+        """Get the server URLs of several keys; providers that can should do this in one read."""
+        return {workspace_id: self.get_server_url(workspace_id) for workspace_id in workspace_ids}
+
+    def list_workspaces(self, after: Optional[str] = None, limit: int = 1000) -> List[str]:
+        """List up to `limit` stored keys in sorted order, starting after `after`."""
+        raise NotImplementedError(f"{type(self).__name__} cannot list workspaces")
+
+    def get_workspaces(self, workspace_ids: Sequence[str]) -> List[WorkspaceRecord]:
+        """Get everything stored for several keys."""
+        return [
+            WorkspaceRecord(
+                workspace_id, self.get_oauth(workspace_id), self.get_server_url(workspace_id)
+            )
+            for workspace_id in workspace_ids
+        ]
+
+    def set_workspaces(self, records: Sequence[WorkspaceRecord]) -> None:
+        """Store several records; values that are None are left as they are."""
+        for record in records:
+            if record.oauth_token is not None:
+                self.set_oauth(record.workspace_id, record.oauth_token)
+            if record.server_url is not None:
+                self.set_server_url(record.workspace_id, record.server_url)
+
+    def reset_after_fork(self) -> None:
+        """Drop connections inherited from a parent process; called in a forked worker."""
+        pass
+
 
 class InMemoryStorageProvider(StorageProvider):
     """Default in-memory storage provider."""
@@ -51,41 +96,309 @@ class InMemoryStorageProvider(StorageProvider):
         self._oauth_tokens.pop(workspace_id, None)
         self._server_urls.pop(workspace_id, None)
 
+    def list_workspaces(self, after: Optional[str] = None, limit: int = 1000) -> List[str]:
+        workspace_ids = sorted(self._oauth_tokens.keys() | self._server_urls.keys())
+        start = bisect.bisect_right(workspace_ids, after) if after is not None else 0
+        return workspace_ids[start : start + limit]
+
+
+def channel_key(team_id: str, channel_id: str) -> str:
+    """Storage key of a channel's server URL override."""
+    return f"channel:{team_id}:{channel_id}"
+
+
+def enterprise_key(enterprise_id: str) -> str:
+    """Storage key of an Enterprise Grid organization's server URL override."""
+    return f"enterprise:{enterprise_id}"
+
+
+class ResolvedServerUrl(NamedTuple):
+    """The server URL in effect for a channel, and the level it was configured at."""
+
+    url: Optional[str]
+    level: str  # "channel", "team", "enterprise" or "default"
+
+
+ResolvedKey = Tuple[Optional[str], str, Optional[str]]  # (enterprise_id, team_id, channel_id)
+
 
 class WorkspaceStore:
-    """Storage utility for workspace-specific settings."""
+    """Storage utility for workspace-specific settings.
+
+    When a `read_timeout` is given, provider reads run under that deadline behind a circuit
+    breaker. A read that times out, fails, or is short-circuited is answered from the last value
+    seen for that key, or for server URLs from `default_server_url`, so a stalled backend cannot
+    hold up the command path.
+
+    The server URL in effect for a channel is resolved from the channel, team, Enterprise Grid
+    organization and default settings in one provider read and memoized per (enterprise, team,
+    channel) for `resolved_ttl` seconds. Setting or deleting a URL through the store drops exactly
+    the memoized values that were resolved from it; the TTL bounds how long a change made by
+    another process goes unseen.
+    """
 
-    def __init__(self, provider: StorageProvider = None) -> None:
+    def __init__(
+        self,
+        provider: StorageProvider = None,
+        default_server_url: Optional[str] = None,
+        read_timeout: Optional[float] = None,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+        max_cached_values: int = 10000,
+        resolved_ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         """Initialize the workspace store with a storage provider."""
         if provider is None:
             self._provider = InMemoryStorageProvider()
         else:
             self._provider = provider
+        self._default_server_url = default_server_url
+        self._read_timeout = read_timeout
+        self._breaker = CircuitBreaker(
+            failure_threshold=breaker_failure_threshold,
+            reset_timeout=breaker_reset_timeout,
+            on_open=lambda: STORAGE_BREAKER_TRIPS.labels(provider=self._provider_name).inc(),
+        )
+        self._executor = DeadlineExecutor(thread_name_prefix="storage-read")
+        self._last_values: OrderedDict[Tuple[str, str], Optional[str]] = OrderedDict()
+        self._last_values_lock = threading.Lock()
+        self._max_cached_values = max_cached_values
+        self._resolved_ttl = resolved_ttl
+        self._clock = clock
+        # memoized resolutions as (value, expiry, storage keys read), least recently used first;
+        # expired values are kept as the fallback for a degraded read
+        self._resolved: OrderedDict[ResolvedKey, Tuple[ResolvedServerUrl, float, List[str]]] = (
+            OrderedDict()
+        )
+        # storage key -> memoized resolutions that depend on it
+        self._dependents: Dict[str, Set[ResolvedKey]] = {}
+        # bumped on every invalidation, so a resolution that raced a write is not memoized
+        self._resolved_generation = 0
+        self._resolved_lock = threading.Lock()
+
+    @property
+    def _provider_name(self) -> str:
+        return type(self._provider).__name__
 
     def set_provider(self, provider: StorageProvider) -> None:
         """Set the storage provider to use."""
         self._provider = provider
+        self._last_values.clear()
+        self._invalidate_resolved(None)
 
+    def reset_after_fork(self) -> None:
+        """Discard threads and connections inherited from the process this one was forked from."""
+        self._executor.reset()
+        self._provider.reset_after_fork()
+
+    def _remember(self, key: Tuple[str, str], value: Optional[str]) -> None:
+        with self._last_values_lock:
+            self._last_values[key] = value
+            self._last_values.move_to_end(key)
+            if len(self._last_values) > self._max_cached_values:
+                self._last_values.popitem(last=False)
+
+    def _forget(self, key: Tuple[str, str]) -> None:
+        with self._last_values_lock:
+            self._last_values.pop(key, None)
+
+    def _record_degraded(self, reason: str) -> None:
+        STORAGE_DEGRADED_READS.labels(provider=self._provider_name, reason=reason).inc()
+        annotate(storage_degraded=reason)
+
+    def _degraded(self, key: Tuple[str, str], reason: str) -> Optional[str]:
+        """Answer a read that could not be served by the provider."""
+        self._record_degraded(reason)
+        with self._last_values_lock:
+            if key in self._last_values:
+                return self._last_values[key]
+        if key[0] == "server_url":
+            return self._default_server_url
+        return None
+
+    def _guarded(self, fetch: Callable[[Any], Any], arg: Any) -> Tuple[Any, Optional[str]]:
+        """Call `fetch(arg)`, within the read deadline if one is configured.
+
+        Returns the result and None, or None and the reason the provider could not answer.
+        """
+        if self._read_timeout is None:
+            return fetch(arg), None
+
+        if not self._breaker.allow_request():
+            return None, "circuit_open"
+        try:
+            value = self._executor.call(fetch, arg, timeout=self._read_timeout)
+        except DeadlineExceeded:
+            self._breaker.record_failure()
+            return None, "timeout"
+        except Exception:
+            self._breaker.record_failure()
+            return None, "error"
+        self._breaker.record_success()
+        return value, None
+
+    def _read(
+        self, field: str, fetch: Callable[[str], Optional[str]], workspace_id: str
+    ) -> Optional[str]:
+        """Read a value from the provider, within the read deadline if one is configured."""
+        key = (field, workspace_id)
+        value, failure = self._guarded(fetch, workspace_id)
+        if failure is not None:
+            return self._degraded(key, failure)
+        if self._read_timeout is not None:
+            self._remember(key, value)
+        return value
+
+    def _memoize(self, resolved_key: ResolvedKey, value: ResolvedServerUrl, keys: List[str]):
+        """Cache a resolution; the caller holds _resolved_lock."""
+        self._unlink(resolved_key)
+        self._resolved[resolved_key] = (value, self._clock() + self._resolved_ttl, keys)
+        for key in keys:
+            self._dependents.setdefault(key, set()).add(resolved_key)
+        if len(self._resolved) > self._max_cached_values:
+            self._unlink(next(iter(self._resolved)))
+
+    def _unlink(self, resolved_key: ResolvedKey) -> None:
+        """Drop a cached resolution; the caller holds _resolved_lock."""
+        entry = self._resolved.pop(resolved_key, None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            dependents = self._dependents.get(key)
+            if dependents is not None:
+                dependents.discard(resolved_key)
+                if not dependents:
+                    del self._dependents[key]
+
+    def _invalidate_resolved(self, key: Optional[str]) -> None:
+        """Drop the cached resolutions read from storage `key`, or all of them for None."""
+        with self._resolved_lock:
+            self._resolved_generation += 1
+            if key is None:
+                self._resolved.clear()
+                self._dependents.clear()
+                return
+            for resolved_key in list(self._dependents.get(key, ())):
+                self._unlink(resolved_key)
+
+    @traced("storage.resolve_server_url")
+    def resolve(
+        self,
+        team_id: str,
+        channel_id: Optional[str] = None,
+        enterprise_id: Optional[str] = None,
+    ) -> ResolvedServerUrl:
+        """Resolve the server URL in effect for a channel and the level it is configured at.
+
+        Levels are consulted from the most specific (channel, then team, then Enterprise Grid
+        organization) to the default.
+        """
+        resolved_key = (enterprise_id, team_id, channel_id)
+        with self._resolved_lock:
+            entry = self._resolved.get(resolved_key)
+            if entry is not None and entry[1] > self._clock():
+                self._resolved.move_to_end(resolved_key)
+                RESOLVED_SERVER_URL_LOOKUPS.labels(result="hit").inc()
+                return entry[0]
+            generation = self._resolved_generation
+
+        levels = []
+        if channel_id:
+            levels.append(("channel", channel_key(team_id, channel_id)))
+        levels.append(("team", team_id))
+        if enterprise_id:
+            levels.append(("enterprise", enterprise_key(enterprise_id)))
+        levels.append(("default", "default"))
+
+        urls, failure = self._guarded(self._provider.get_server_urls, [key for _, key in levels])
+        if failure is not None:
+            self._record_degraded(failure)
+            RESOLVED_SERVER_URL_LOOKUPS.labels(result="degraded").inc()
+            if entry is not None:
+                return entry[0]
+            return ResolvedServerUrl(self._default_server_url, "default")
+
+        value, keys = ResolvedServerUrl(self._default_server_url, "default"), []
+        for level, key in levels:
+            # the value only depends on the levels down to the one that is set
+            keys.append(key)
+            if urls.get(key):
+                value = ResolvedServerUrl(urls[key], level)
+                break
+        RESOLVED_SERVER_URL_LOOKUPS.labels(result="miss").inc()
+        if self._resolved_ttl > 0:
+            with self._resolved_lock:
+                if generation == self._resolved_generation:
+                    self._memoize(resolved_key, value, keys)
+        return value
+
+    def resolve_server_url(
+        self,
+        team_id: str,
+        channel_id: Optional[str] = None,
+        enterprise_id: Optional[str] = None,
+    ) -> Optional[str]:
+        """Get the server URL in effect for a channel."""
+        return self.resolve(team_id, channel_id, enterprise_id).url
+
+    @traced("storage.get_workspace_oauth")
     def get_workspace_oauth(self, workspace_id: str) -> Optional[str]:
         """Get OAuth token for a workspace."""
-        return self._provider.get_oauth(workspace_id)
+        return self._read("oauth", self._provider.get_oauth, workspace_id)
 
+    @traced("storage.set_workspace_oauth")
     def set_workspace_oauth(self, workspace_id: str, oauth_token: str) -> None:
         """Store OAuth token for a workspace."""
         self._provider.set_oauth(workspace_id, oauth_token)
+        self._remember(("oauth", workspace_id), oauth_token)
 
+    @traced("storage.get_workspace_server_url")
     def get_workspace_server_url(self, workspace_id: str) -> Optional[str]:
         """Get Jitsi server URL for a workspace."""
-        return self._provider.get_server_url(workspace_id) or self._provider.get_server_url(
-            "default"
+        return self._read("server_url", self._provider.get_server_url, workspace_id) or self._read(
+            "server_url", self._provider.get_server_url, "default"
         )
 
+    @traced("storage.set_workspace_server_url")
     def set_workspace_server_url(self, workspace_id: str, server_url: str) -> None:
         """Set Jitsi server URL for a workspace."""
-        if not server_url.endswith("/"):
-            server_url = server_url + "/"
-        self._provider.set_server_url(workspace_id, server_url)
+        self._set_server_url(workspace_id, server_url)
+
+    @traced("storage.set_channel_server_url")
+    def set_channel_server_url(self, team_id: str, channel_id: str, server_url: str) -> None:
+        """Set the Jitsi server URL of one channel, overriding the team and organization."""
+        self._set_server_url(channel_key(team_id, channel_id), server_url)
+
+    @traced("storage.delete_channel_server_url")
+    def delete_channel_server_url(self, team_id: str, channel_id: str) -> None:
+        """Remove a channel's server URL override."""
+        self._delete(channel_key(team_id, channel_id))
+
+    @traced("storage.set_enterprise_server_url")
+    def set_enterprise_server_url(self, enterprise_id: str, server_url: str) -> None:
+        """Set the Jitsi server URL of an Enterprise Grid organization's workspaces."""
+        self._set_server_url(enterprise_key(enterprise_id), server_url)
+
+    @traced("storage.delete_enterprise_server_url")
+    def delete_enterprise_server_url(self, enterprise_id: str) -> None:
+        """Remove an Enterprise Grid organization's server URL."""
+        self._delete(enterprise_key(enterprise_id))
+
+    def _set_server_url(self, key: str, server_url: str) -> None:
+        # a setting may name a pool of servers separated by spaces (see probe.py)
+        server_url = " ".join(url if url.endswith("/") else url + "/" for url in server_url.split())
+        self._provider.set_server_url(key, server_url)
+        self._remember(("server_url", key), server_url)
+        self._invalidate_resolved(key)
+
+    def _delete(self, key: str) -> None:
+        self._provider.delete_workspace(key)
+        self._forget(("oauth", key))
+        self._forget(("server_url", key))
+        self._invalidate_resolved(key)
 
+    @traced("storage.delete_workspace")
     def delete_workspace(self, workspace_id: str) -> None:
         """Delete all data for a workspace."""
-        self._provider.delete_workspace(workspace_id)
+        self._delete(workspace_id)
@@ -0,0 +1,147 @@
+"""
+Precompiled Block Kit message templates.
+
+A BlockTemplate is declared once as a block tree with Slot placeholders and compiled into:
+- a generated render function whose body is a single literal expression, so that only the
+  containers on the path to a slot are built per message and every static subtree is shared
+- a serialized form, split around the slots, that renders straight to JSON text with each slot
+  value escaped
+
+Rendered blocks share their static parts, so they must be treated as read-only.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+SLOT_KINDS = ("text", "url")
+URL_SCHEMES = ("https://", "http://")
+
+
+class Slot:
+    """A typed placeholder in a BlockTemplate.
+
+    Args:
+        name: keyword used to fill the slot when rendering
+        kind: "text" for any text, "url" for an http(s) URL
+        fmt: format string the value is substituted into, e.g. "{} server"
+    """
+
+    __slots__ = ("name", "kind", "fmt")
+
+    def __init__(self, name: str, kind: str = "text", fmt: str = "{}"):
+        if kind not in SLOT_KINDS:
+            raise ValueError(f"unknown slot kind {kind}; expected one of {SLOT_KINDS}")
+        if not name.isidentifier():
+            raise ValueError(f"slot name must be an identifier, got {name!r}")
+        self.name = name
+        self.kind = kind
+        self.fmt = fmt
+
+    def render(self, value: Any) -> str:
+        value = _check_url(value, self.name) if self.kind == "url" else str(value)
+        return self.fmt.format(value)
+
+
+def _check_url(value: Any, name: str = "url") -> str:
+    value = str(value)
+    if not value.startswith(URL_SCHEMES):
+        raise ValueError(f"slot {name} requires an http(s) URL, got {value!r}")
+    return value
+
+
+def _source(node: Any, constants: List[Any], slots: List[Slot]) -> Optional[str]:
+    """Return a Python expression building `node`, or None if it contains no slots."""
+    if isinstance(node, Slot):
+        slots.append(node)
+        value = node.name
+        if node.kind == "url":
+            # the common case (already a valid str) is checked inline without a function call
+            value = (
+                f"({value} if type({value}) is str and {value}.startswith(_url_schemes)"
+                f" else _check_url({value}, {value!r}))"
+            )
+        if node.fmt == "{}":
+            return f'f"{{{value}}}"' if node.kind == "text" else value
+        constants.append(node.fmt)
+        return f"_constants[{len(constants) - 1}].format({value})"
+
+    if isinstance(node, (dict, list)):
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        children = [(key, _source(child, constants, slots)) for key, child in items]
+        if all(child is None for _, child in children):
+            return None
+        parts = []
+        for key, child in children:
+            if child is None and isinstance(node[key], (dict, list)):
+                # static subtrees are built once and shared by every rendered message
+                constants.append(node[key])
+                child = f"_constants[{len(constants) - 1}]"
+            elif child is None:
+                child = repr(node[key])
+            parts.append(f"{key!r}: {child}" if isinstance(node, dict) else child)
+        return "{" + ", ".join(parts) + "}" if isinstance(node, dict) else f"[{', '.join(parts)}]"
+
+    return None
+
+
+def _compile(blocks: List[Dict[str, Any]]) -> Callable[..., List[Dict[str, Any]]]:
+    """Generate a function taking the template's slots as keyword arguments."""
+    constants: List[Any] = []
+    slots: List[Slot] = []
+    expression = _source(blocks, constants, slots)
+    if expression is None:
+        return lambda: blocks
+    names = list(dict.fromkeys(slot.name for slot in slots))
+    source = f"def render(*, {', '.join(names)}):\n    return {expression}\n"
+    namespace = {"_constants": constants, "_check_url": _check_url, "_url_schemes": URL_SCHEMES}
+    exec(compile(source, "<block template>", "exec"), namespace)
+    return namespace["render"]
+
+
+def _replace_slots(node: Any, slots: List[Slot]) -> Any:
+    """Copy a template tree with each slot replaced by a unique marker string."""
+    if isinstance(node, Slot):
+        slots.append(node)
+        return f"\x00slot{len(slots) - 1}\x00"
+    if isinstance(node, dict):
+        return {key: _replace_slots(child, slots) for key, child in node.items()}
+    if isinstance(node, list):
+        return [_replace_slots(child, slots) for child in node]
+    return node
+
+
+class BlockTemplate:
+    """A Block Kit message shape compiled once and rendered many times.
+
+    `render(**slots)` returns the (read-only) list of Slack message blocks and
+    `render_json(**slots)` returns the same message as JSON text.
+    """
+
+    def __init__(self, blocks: List[Dict[str, Any]]):
+        self.blocks = blocks
+        # render(**slots) is the generated function itself, so a call costs no extra frame
+        self.render: Callable[..., List[Dict[str, Any]]] = _compile(blocks)
+
+        slots: List[Slot] = []
+        serialized = json.dumps(_replace_slots(blocks, slots), separators=(",", ":"))
+        self._chunks: List[str] = []
+        for i in range(len(slots)):
+            chunk, serialized = serialized.split(json.dumps(f"\x00slot{i}\x00"), 1)
+            self._chunks.append(chunk)
+        self._chunks.append(serialized)
+        self._slots = slots
+        self.slot_names = frozenset(slot.name for slot in slots)
+
+    def _check(self, values: Dict[str, Any]) -> None:
+        missing = self.slot_names.difference(values)
+        if missing:
+            raise TypeError(f"missing template slots: {', '.join(sorted(missing))}")
+
+    def render_json(self, **values: Any) -> str:
+        """Render the template straight to its JSON text, escaping every slot value."""
+        self._check(values)
+        parts = [self._chunks[0]]
+        for slot, chunk in zip(self._slots, self._chunks[1:]):
+            parts.append(json.dumps(slot.render(values[slot.name])))
+            parts.append(chunk)
+        return "".join(parts)
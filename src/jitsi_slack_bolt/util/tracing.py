@@ -0,0 +1,389 @@
+"""
+Lightweight request tracing for the Jitsi Slack integration.
+
+Spans are timed around command dispatch, WorkspaceStore calls, Slack Web API methods and
+response_url posts, and nest through a context variable so every span of a command shares one
+trace. Finished traces are exported in the OTLP/JSON encoding, either appended to a local file
+(one export request per line) or posted to an OTLP/HTTP collector, from a background thread.
+
+Tracing is disabled until set_tracer() installs a Tracer; until then span() and traced() cost a
+global and a context variable lookup. The same call sites also report their durations to
+collect_stages(), which the slow request watchdog uses without needing a tracer.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+SPANS_EXPORTED = Counter("jitsi_slack_trace_spans_exported_total", "Trace spans exported")
+SPANS_DROPPED = Counter(
+    "jitsi_slack_trace_spans_dropped_total",
+    "Trace spans dropped because the export queue was full or the exporter failed",
+)
+
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+logger = logging.getLogger(__name__)
+
+
+class _Trace:
+    """Spans recorded so far for one trace and whether it was sampled at its root."""
+
+    __slots__ = ("trace_id", "sampled", "spans")
+
+    def __init__(self, sampled: bool):
+        self.trace_id = os.urandom(16).hex()
+        self.sampled = sampled
+        self.spans: List["Span"] = []
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "_start_perf_ns",
+        "status",
+        "status_message",
+    )
+
+    def __init__(self, name: str, trace: _Trace, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self._start_perf_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def duration(self) -> float:
+        """Seconds between the start and end of the span."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.end_ns = self.start_ns + time.perf_counter_ns() - self._start_perf_ns
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON carries 64 bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _attribute_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Encode finished spans as an OTLP/JSON ExportTraceServiceRequest."""
+    encoded = []
+    for span in spans:
+        item = {
+            "traceId": span.trace.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": _attributes(span.attributes),
+            "status": {"code": span.status, "message": span.status_message},
+        }
+        if span.parent_id:
+            item["parentSpanId"] = span.parent_id
+        encoded.append(item)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _attributes({"service.name": service_name})},
+                "scopeSpans": [{"scope": {"name": "jitsi_slack_bolt"}, "spans": encoded}],
+            }
+        ]
+    }
+
+
+class FileExporter:
+    """Appends each batch to `path` as one line of OTLP/JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as out:
+            out.write(json.dumps(payload, separators=(",", ":")) + "\n")
+
+
+class OtlpHttpExporter:
+    """Posts each batch to an OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, payload: Dict[str, Any]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload, separators=(",", ":")).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class Tracer:
+    """Records spans and hands finished traces to an exporter on a background thread.
+
+    Args:
+        exporter: object with an `export(payload)` method taking an OTLP/JSON request
+        sample_rate: fraction of traces exported, decided when the root span starts
+        slow_threshold: if set, traces whose root span took at least this many seconds are
+            exported even when they were not sampled, so tail latency is always visible
+        service_name: reported as the service.name resource attribute
+        max_queue_size: finished traces waiting for export; traces beyond this are dropped
+        flush_interval: seconds the export thread waits to batch traces together
+    """
+
+    def __init__(
+        self,
+        exporter: Any,
+        sample_rate: float = 1.0,
+        slow_threshold: Optional[float] = None,
+        service_name: str = "jitsi-slack",
+        max_queue_size: int = 2048,
+        flush_interval: float = 1.0,
+    ):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.service_name = service_name
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """Time the enclosed block as a span named `name`, a child of the current span if any.
+
+        Yields None when the trace is neither sampled nor kept for the slow threshold.
+        """
+        parent = _current_span.get()
+        if parent is _NOT_RECORDING:
+            yield None
+            return
+        if parent is None:
+            sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+            if not sampled and self.slow_threshold is None:
+                # mark the context so nested spans of this command are skipped too
+                token = _current_span.set(_NOT_RECORDING)
+                try:
+                    yield None
+                finally:
+                    _current_span.reset(token)
+                return
+            trace, parent_id = _Trace(sampled), None
+        else:
+            trace, parent_id = parent.trace, parent.span_id
+
+        span = Span(name, trace, parent_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = STATUS_ERROR
+            span.status_message = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+            trace.spans.append(span)
+            if parent is None:
+                self._finish(trace, span)
+
+    def _finish(self, trace: _Trace, root: Span) -> None:
+        if not trace.sampled and root.duration < self.slow_threshold:
+            return
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(trace.spans)
+        except queue.Full:
+            SPANS_DROPPED.inc(len(trace.spans))
+
+    def _ensure_thread(self) -> None:
+        # threads do not survive a fork, so each worker starts its own export thread
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self._queue.maxsize)
+                self._thread = threading.Thread(target=self._run, name="trace-export", daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def _drain(self) -> List[Span]:
+        spans = []
+        while True:
+            try:
+                spans.extend(self._queue.get_nowait())
+            except queue.Empty:
+                return spans
+
+    def _export(self, spans: List[Span]) -> None:
+        try:
+            self.exporter.export(to_otlp(spans, self.service_name))
+        except Exception as e:
+            logger.warning(f"failed to export {len(spans)} spans: {e}")
+            SPANS_DROPPED.inc(len(spans))
+            return
+        SPANS_EXPORTED.inc(len(spans))
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Export every queued trace on the calling thread."""
+        with self._export_lock:
+            spans = self._drain()
+            if spans:
+                self._export(spans)
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "jitsi_slack_current_span", default=None
+)
+# current span of a trace that was not sampled
+_NOT_RECORDING: Any = object()
+_tracer: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Install (or with None, remove) the tracer used by span and traced."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+# (name, seconds) of each span finished while a request's stages are being collected
+_stage_timings: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "jitsi_slack_stage_timings", default=None
+)
+
+
+@contextmanager
+def collect_stages() -> Iterator[List[Tuple[str, float]]]:
+    """Collect the name and duration of every span finished within the block, traced or not."""
+    stages: List[Tuple[str, float]] = []
+    token = _stage_timings.set(stages)
+    try:
+        yield stages
+    finally:
+        _stage_timings.reset(token)
+
+
+@contextmanager
+def _timed(name: str, stages: List[Tuple[str, float]], inner) -> Iterator[Optional[Span]]:
+    start = time.perf_counter()
+    try:
+        with inner as current:
+            yield current
+    finally:
+        stages.append((name, time.perf_counter() - start))
+
+
+def span(name: str, **attributes: Any):
+    """Context manager timing a span with the installed tracer; does nothing when disabled."""
+    stages = _stage_timings.get()
+    if stages is None:
+        return nullcontext() if _tracer is None else _tracer.span(name, **attributes)
+    inner = nullcontext() if _tracer is None else _tracer.span(name, **attributes)
+    return _timed(name, stages, inner)
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the current span, if one is being recorded."""
+    current = _current_span.get()
+    if current is not None and current is not _NOT_RECORDING:
+        current.attributes.update(attributes)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorator recording each call of the function as a span named `name`."""
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _tracer is None and _stage_timings.get() is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracedWebClient:
+    """Proxy for a slack_sdk WebClient that records every API method call as a span."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        def call(*args, **kwargs):
+            with span(f"slack.{name}"):
+                return attr(*args, **kwargs)
+
+        return call
+
+
+def traced_callable(name: str, fn: Callable) -> Callable:
+    """Wrap `fn` (e.g. Bolt's respond) so each call is recorded as a span named `name`."""
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        with span(name):
+            return fn(*args, **kwargs)
+
+    return call
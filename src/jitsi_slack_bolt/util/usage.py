@@ -0,0 +1,158 @@
+"""
+Meeting Usage Events
+
+Every room created emits a usage event (team, channel, subcommand, server and time). Recording an
+event only puts it on a bounded in-process queue; a background thread writes the queued events
+in batches to a sink, either an append-only JSON lines file or the Postgres usage_events table.
+
+When the queue is full, because the sink is slow or down, new events are dropped rather than
+slowing down commands, and counted in jitsi_slack_usage_events_dropped_total.
+
+Usage events are not recorded until set_usage_recorder() installs a recorder.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from logging import getLogger
+from typing import Any, List, NamedTuple, Optional
+
+from prometheus_client import Counter
+
+USAGE_EVENTS_WRITTEN = Counter(
+    "jitsi_slack_usage_events_written_total", "Usage events written to the usage log"
+)
+USAGE_EVENTS_DROPPED = Counter(
+    "jitsi_slack_usage_events_dropped_total",
+    "Usage events lost because the queue was full or the write failed",
+    ["reason"],
+)
+
+USAGE_SINKS = ("none", "file", "postgres")
+
+logger = getLogger(__name__)
+
+
+class UsageEvent(NamedTuple):
+    """A room created by a command."""
+
+    team_id: Optional[str]
+    channel_id: Optional[str]
+    subcommand: str
+    server_url: str
+    timestamp: float
+
+
+class FileUsageSink:
+    """Appends each batch of events to `path` as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, events: List[UsageEvent]) -> None:
+        lines = "".join(
+            json.dumps(event._asdict(), separators=(",", ":")) + "\n" for event in events
+        )
+        with open(self.path, "a", encoding="utf-8") as out:
+            out.write(lines)
+
+
+class UsageRecorder:
+    """Queues usage events and writes them to `sink` in batches on a background thread.
+
+    Args:
+        sink: object with a `write(events)` method
+        max_queue_size: events waiting to be written; events beyond this are dropped
+        batch_size: events written at once; a full batch is written without waiting
+        flush_interval: seconds the writer waits to batch events together
+    """
+
+    def __init__(
+        self,
+        sink: Any,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(max_queue_size)
+        self._wake = threading.Event()
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def record(self, event: UsageEvent) -> None:
+        """Queue an event without blocking."""
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            USAGE_EVENTS_DROPPED.labels(reason="queue_full").inc()
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_thread(self) -> None:
+        # threads do not survive a fork, so each worker starts its own writer
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(self._queue.maxsize)
+                threading.Thread(target=self._run, name="usage-writer", daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _next_batch(self) -> List[UsageEvent]:
+        events = []
+        while len(events) < self.batch_size:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def flush(self) -> None:
+        """Write every queued event on the calling thread."""
+        with self._write_lock:
+            while True:
+                events = self._next_batch()
+                if not events:
+                    return
+                try:
+                    self.sink.write(events)
+                except Exception as e:
+                    logger.warning(f"failed to write {len(events)} usage events: {e}")
+                    USAGE_EVENTS_DROPPED.labels(reason="write_error").inc(len(events))
+                    return
+                USAGE_EVENTS_WRITTEN.inc(len(events))
+
+
+_usage_recorder: Optional[UsageRecorder] = None
+
+
+def set_usage_recorder(recorder: Optional[UsageRecorder]) -> None:
+    """Install (or with None, remove) the recorder used by record_usage."""
+    global _usage_recorder
+    _usage_recorder = recorder
+
+
+def get_usage_recorder() -> Optional[UsageRecorder]:
+    return _usage_recorder
+
+
+def record_usage(
+    team_id: Optional[str], channel_id: Optional[str], subcommand: str, server_url: str
+) -> None:
+    """Record that a room was created, if a recorder is installed."""
+    if _usage_recorder is not None:
+        _usage_recorder.record(UsageEvent(team_id, channel_id, subcommand, server_url, time.time()))
@@ -0,0 +1,191 @@
+"""
+Jitsi Server Validation
+
+Before `/jitsi server <url>` saves a server, the server is checked in the background: its host
+name must resolve, an https server must complete a TLS handshake with a valid certificate, and
+the URL must answer an HTTP request without an error. The whole check runs under one deadline,
+and its result is cached per host so that setting the same server in many channels or
+workspaces checks it once.
+
+Validation is disabled until set_server_validator() installs a validator.
+"""
+
+import os
+import socket
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from typing import Callable, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from prometheus_client import Counter
+
+from .resilience import DeadlineExceeded, DeadlineExecutor
+
+SERVER_VALIDATIONS = Counter(
+    "jitsi_slack_server_validations_total",
+    "Server URLs checked before being saved, by result",
+    ["result"],
+)
+
+logger = getLogger(__name__)
+
+
+def check_server(server_url: str, timeout: float) -> Optional[str]:
+    """Check that a Jitsi server is reachable; returns why it is not, or None if it is."""
+    parsed = urlparse(server_url)
+    host = parsed.hostname
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        return f"{host} could not be resolved"
+
+    if parsed.scheme == "https":
+        context = ssl.create_default_context()
+        try:
+            with socket.create_connection((host, port), timeout=timeout) as sock:
+                with context.wrap_socket(sock, server_hostname=host):
+                    pass
+        except ssl.SSLError as e:
+            return f"the TLS handshake with {host} failed ({e.reason or e})"
+        except OSError:
+            return f"{host}:{port} refused or did not accept the connection"
+
+    try:
+        with urllib.request.urlopen(server_url, timeout=timeout):
+            pass
+    except urllib.error.HTTPError as e:
+        return f"{server_url} answered with HTTP {e.code}"
+    except (OSError, ValueError):
+        return f"{server_url} did not answer"
+    return None
+
+
+class ServerValidator:
+    """Checks servers in the background and caches the results per host.
+
+    Args:
+        timeout: seconds a server's whole check may take before it counts as unreachable
+        cache_ttl: seconds a host's successful result is reused for
+        failure_ttl: seconds a host's failed result is reused for, kept short so that a server
+            that was briefly down can be set again soon
+        max_cached_hosts: results kept; the least recently used is dropped first
+        check: called with a server URL and the timeout; returns why the server is unusable
+    """
+
+    def __init__(
+        self,
+        timeout: float = 3.0,
+        cache_ttl: float = 300.0,
+        failure_ttl: float = 30.0,
+        max_cached_hosts: int = 1000,
+        max_workers: int = 4,
+        check: Callable[[str, float], Optional[str]] = check_server,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.failure_ttl = failure_ttl
+        self.max_cached_hosts = max_cached_hosts
+        self._max_workers = max_workers
+        self._check = check
+        self._clock = clock
+        self._deadline = DeadlineExecutor(max_workers=max_workers, thread_name_prefix="validate")
+        self._results: OrderedDict[str, Tuple[Optional[str], float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+
+    @staticmethod
+    def _host(server_url: str) -> str:
+        parsed = urlparse(server_url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def cached(self, server_url: str) -> Tuple[bool, Optional[str]]:
+        """Return whether a result is cached for the server's host, and that result."""
+        host = self._host(server_url)
+        with self._lock:
+            entry = self._results.get(host)
+            if entry is None or entry[1] <= self._clock():
+                return False, None
+            self._results.move_to_end(host)
+            return True, entry[0]
+
+    def validate(self, server_url: str) -> Optional[str]:
+        """Check a server, waiting at most `timeout`; returns why it is unusable, or None."""
+        found, failure = self.cached(server_url)
+        if found:
+            return failure
+        try:
+            failure = self._deadline.call(
+                self._check, server_url, self.timeout, timeout=self.timeout
+            )
+        except DeadlineExceeded:
+            failure = f"{server_url} did not answer within {self.timeout:g}s"
+        except Exception as e:
+            logger.exception(f"failed to check {server_url}")
+            failure = f"{server_url} could not be checked ({e})"
+        SERVER_VALIDATIONS.labels(result="invalid" if failure else "valid").inc()
+        with self._lock:
+            ttl = self.failure_ttl if failure else self.cache_ttl
+            self._results[self._host(server_url)] = (failure, self._clock() + ttl)
+            if len(self._results) > self.max_cached_hosts:
+                self._results.popitem(last=False)
+        return failure
+
+    def _validate_all(self, server_urls: Sequence[str]) -> Optional[str]:
+        for server_url in server_urls:
+            failure = self.validate(server_url)
+            if failure:
+                return failure
+        return None
+
+    def validate_async(
+        self, server_urls: Sequence[str], callback: Callable[[Optional[str]], None]
+    ) -> bool:
+        """Check servers in the background and call `callback` with the first failure, or None.
+
+        Returns True if every result was cached and `callback` has already been called.
+        """
+        results = [self.cached(server_url) for server_url in server_urls]
+        if all(found for found, _ in results):
+            callback(next((failure for _, failure in results if failure), None))
+            return True
+        self._get_pool().submit(self._run, server_urls, callback)
+        return False
+
+    def _run(self, server_urls: Sequence[str], callback: Callable[[Optional[str]], None]) -> None:
+        try:
+            callback(self._validate_all(server_urls))
+        except Exception:
+            logger.exception(f"failed to report validation of {', '.join(server_urls)}")
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # threads do not survive a fork, so each worker creates its own pool
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="server-validation"
+                )
+                self._deadline.reset()
+                self._pid = os.getpid()
+            return self._pool
+
+
+_server_validator: Optional[ServerValidator] = None
+
+
+def set_server_validator(validator: Optional[ServerValidator]) -> None:
+    """Install (or with None, remove) the validator used by /jitsi server."""
+    global _server_validator
+    _server_validator = validator
+
+
+def get_server_validator() -> Optional[ServerValidator]:
+    return _server_validator
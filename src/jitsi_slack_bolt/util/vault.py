@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence
 import hvac
-from .store import StorageProvider
+from .store import StorageProvider, WorkspaceRecord
 
 # take a primary vault and backup vault
 # always write to both
@@ -26,16 +26,24 @@ class VaultStorageProvider(StorageProvider):
         self.mount_point = mount_point
         self.path_prefix = path_prefix
 
-    def _get_secret(self, workspace_id: str, key: str) -> Optional[str]:
-        """Helper to read a secret from Vault."""
+    def reset_after_fork(self) -> None:
+        # the underlying requests session may hold sockets shared with the parent process
+        self.client = hvac.Client(url=self.client.url, token=self.client.token)
+
+    def _read_secrets(self, workspace_id: str) -> Dict[str, Any]:
+        """Helper to read all secrets of a workspace from Vault."""
         try:
             path = f"{self.path_prefix}/{workspace_id}"
             result = self.client.secrets.kv.v2.read_secret_version(
                 path=path, mount_point=self.mount_point
             )
-            return result["data"]["data"].get(key)
+            return result["data"]["data"]
         except (hvac.exceptions.VaultError, KeyError):
-            return None
+            return {}
+
+    def _get_secret(self, workspace_id: str, key: str) -> Optional[str]:
+        """Helper to read a secret from Vault."""
+        return self._read_secrets(workspace_id).get(key)
 
     def _set_secret(self, workspace_id: str, key: str, value: str) -> None:
         """Helper to write a secret to Vault."""
@@ -83,3 +91,40 @@ class VaultStorageProvider(StorageProvider):
             )
         except hvac.exceptions.VaultError:
             pass  # Ignore errors if secret doesn't exist
+
+    def list_workspaces(self, after: Optional[str] = None, limit: int = 1000) -> List[str]:
+        # KV lists every key under the prefix at once, so pages are cut from the full listing
+        try:
+            result = self.client.secrets.kv.v2.list_secrets(
+                path=self.path_prefix, mount_point=self.mount_point
+            )
+        except hvac.exceptions.InvalidPath:
+            return []
+        workspace_ids = sorted(key for key in result["data"]["keys"] if not key.endswith("/"))
+        if after is not None:
+            workspace_ids = [workspace_id for workspace_id in workspace_ids if workspace_id > after]
+        return workspace_ids[:limit]
+
+    def get_workspaces(self, workspace_ids: Sequence[str]) -> List[WorkspaceRecord]:
+        """Read each workspace's secret once rather than once per value."""
+        records = []
+        for workspace_id in workspace_ids:
+            data = self._read_secrets(workspace_id)
+            records.append(
+                WorkspaceRecord(workspace_id, data.get("oauth_token"), data.get("server_url"))
+            )
+        return records
+
+    def set_workspaces(self, records: Sequence[WorkspaceRecord]) -> None:
+        """Write each workspace's secret once rather than once per value."""
+        for record in records:
+            data = self._read_secrets(record.workspace_id)
+            if record.oauth_token is not None:
+                data["oauth_token"] = record.oauth_token
+            if record.server_url is not None:
+                data["server_url"] = record.server_url
+            self.client.secrets.kv.v2.create_or_update_secret(
+                path=f"{self.path_prefix}/{record.workspace_id}",
+                secret=data,
+                mount_point=self.mount_point,
+            )
@@ -0,0 +1,174 @@
+"""
+Slow request watchdog.
+
+Every watched request is registered while it runs. A monitor thread checks the in-flight
+requests at a fixed interval and samples the stack of the thread handling any request that has
+passed the threshold, so the slow code path is captured while it is still slow. When such a
+request finishes it is recorded, with its attributes (subcommand, team ID), the time spent in
+each traced stage (storage reads, Slack API calls, respond) and its stack samples, in a bounded
+ring buffer served on the admin endpoints and counted in metrics.
+
+The watchdog is disabled until set_watchdog() installs one.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter, deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from prometheus_client import Counter
+
+from .profiling import collapse_stack
+from .tracing import collect_stages
+
+SLOW_REQUESTS = Counter(
+    "jitsi_slack_slow_requests_total",
+    "Requests that took longer than the slow request threshold",
+    ["subcommand"],
+)
+SLOW_REQUEST_STAGE_SECONDS = Counter(
+    "jitsi_slack_slow_request_stage_seconds_total",
+    "Time spent in each stage of requests that took longer than the slow request threshold",
+    ["stage"],
+)
+
+
+class _InFlight:
+    """A request being watched."""
+
+    __slots__ = ("name", "attributes", "thread_id", "thread_name", "started", "stacks")
+
+    def __init__(self, name: str, attributes: Dict[str, Any], started: float):
+        self.name = name
+        self.attributes = attributes
+        self.thread_id = threading.get_ident()
+        self.thread_name = threading.current_thread().name
+        self.started = started
+        self.stacks: StackCounter = StackCounter()
+
+
+class SlowRequestWatchdog:
+    """Records requests slower than `threshold` seconds.
+
+    Args:
+        threshold: seconds after which a request counts as slow
+        capacity: slow requests kept; the oldest are dropped first
+        check_interval: seconds between checks (and stack samples) of in-flight requests
+        max_stack_samples: stack samples kept per slow request
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        capacity: int = 100,
+        check_interval: float = 0.1,
+        max_stack_samples: int = 50,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.threshold = threshold
+        self.check_interval = check_interval
+        self.max_stack_samples = max_stack_samples
+        self._clock = clock
+        self._in_flight: Dict[int, _InFlight] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    @contextmanager
+    def watch(self, name: str, **attributes: Any) -> Iterator[_InFlight]:
+        """Watch the enclosed block; attributes may be added to the yielded request."""
+        self._ensure_monitor()
+        request = _InFlight(name, attributes, self._clock())
+        with self._lock:
+            self._in_flight[id(request)] = request
+        try:
+            with collect_stages() as stages:
+                yield request
+        finally:
+            elapsed = self._clock() - request.started
+            with self._lock:
+                del self._in_flight[id(request)]
+            if elapsed >= self.threshold:
+                self._record(request, elapsed, stages)
+
+    def _record(self, request: _InFlight, elapsed: float, stages) -> None:
+        totals: Dict[str, float] = {}
+        for stage, seconds in stages:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        SLOW_REQUESTS.labels(subcommand=request.attributes.get("subcommand", "unknown")).inc()
+        for stage, seconds in totals.items():
+            SLOW_REQUEST_STAGE_SECONDS.labels(stage=stage).inc(seconds)
+        with self._lock:
+            self._slow.append(
+                {
+                    "name": request.name,
+                    "attributes": request.attributes,
+                    "finished_at": time.time(),
+                    "elapsed": elapsed,
+                    "stages": [{"name": name, "elapsed": seconds} for name, seconds in stages],
+                    "stage_totals": totals,
+                    "stacks": [
+                        {"stack": stack, "samples": count}
+                        for stack, count in request.stacks.most_common()
+                    ],
+                    "pid": os.getpid(),
+                }
+            )
+
+    def sample(self) -> None:
+        """Sample the stacks of in-flight requests that have passed the threshold."""
+        now = self._clock()
+        # hold the lock throughout so a request cannot be recorded while it is being sampled
+        with self._lock:
+            slow = [r for r in self._in_flight.values() if now - r.started >= self.threshold]
+            if not slow:
+                return
+            frames = sys._current_frames()
+            for request in slow:
+                frame = frames.get(request.thread_id)
+                if frame is not None and sum(request.stacks.values()) < self.max_stack_samples:
+                    request.stacks[collapse_stack(frame, request.thread_name)] += 1
+
+    def _ensure_monitor(self) -> None:
+        # threads do not survive a fork, so each worker starts its own monitor
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                threading.Thread(
+                    target=self._run, name="slow-request-watchdog", daemon=True
+                ).start()
+                self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.check_interval)
+            self.sample()
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Return the recorded slow requests, most recent first."""
+        with self._lock:
+            return list(reversed(self._slow))
+
+
+_watchdog: Optional[SlowRequestWatchdog] = None
+
+
+def set_watchdog(watchdog: Optional[SlowRequestWatchdog]) -> None:
+    """Install (or with None, remove) the watchdog used by watch_request."""
+    global _watchdog
+    _watchdog = watchdog
+
+
+def get_watchdog() -> Optional[SlowRequestWatchdog]:
+    return _watchdog
+
+
+def watch_request(name: str, **attributes: Any):
+    """Watch a request with the installed watchdog; yields None when there is none."""
+    if _watchdog is None:
+        return nullcontext()
+    return _watchdog.watch(name, **attributes)
@@ -46,6 +46,8 @@ export PROMETHEUS_MULTIPROC_DIR=/tmp
 cd src/jitsi_slack_bolt
 
 if [ -n "$DEBUG_LEVEL" ] && [ "$DEBUG_LEVEL" = "debug" ]; then
+    # code reloading re-imports the app in each worker, so the master must not preload it
+    export GUNICORN_PRELOAD_APP="false"
     gunicorn --config gunicorn-config.py --reload app:app
 else
     gunicorn --config gunicorn-config.py app:app
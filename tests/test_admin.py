@@ -0,0 +1,110 @@
+import threading
+import time
+import tracemalloc
+from flask import Flask
+from jitsi_slack_bolt.admin import create_admin_blueprint
+from jitsi_slack_bolt.util.profiling import StackSampler
+
+AUTH = {"Authorization": "Bearer admin-secret"}
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+class TestStackSampler:
+    """Test the background stack sampler"""
+
+    def test_samples_other_threads(self, tmp_path):
+        """Test a busy thread shows up in the collapsed stacks of a finished profile"""
+        # Setup
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,), name="busy-worker")
+        worker.start()
+        sampler = StackSampler(str(tmp_path))
+
+        # Action
+        try:
+            sampler.start(0.1, interval=0.001)
+            while sampler.running:
+                time.sleep(0.01)
+        finally:
+            stop.set()
+            worker.join()
+
+        # Assert
+        pid, collapsed = sampler.latest()
+        assert "busy-worker;" in collapsed
+        assert "busy_loop (test_admin.py:" in collapsed
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+    def test_duration_is_capped(self, tmp_path):
+        """Test a profile never runs longer than max_seconds"""
+        sampler = StackSampler(str(tmp_path), max_seconds=0.05)
+
+        assert sampler.start(3600) == 0.05
+
+
+class TestAdminEndpoints:
+    """Test the authenticated admin blueprint"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.app = Flask(__name__)
+
+    def teardown_method(self):
+        """Stop any allocation tracing started by a test"""
+        tracemalloc.stop()
+
+    def client(self, tmp_path):
+        self.app.register_blueprint(create_admin_blueprint("admin-secret", str(tmp_path)))
+        return self.app.test_client()
+
+    def test_requires_token(self, tmp_path):
+        """Test requests without the bearer token are rejected"""
+        client = self.client(tmp_path)
+
+        assert client.get("/admin/heap").status_code == 401
+        assert client.get("/admin/heap", headers={"Authorization": "Bearer nope"}).status_code == (
+            401
+        )
+
+    def test_profile_round_trip(self, tmp_path):
+        """Test a started profile can be fetched once it has finished"""
+        client = self.client(tmp_path)
+
+        assert client.get("/admin/profile", headers=AUTH).status_code == 404
+        started = client.post("/admin/profile?seconds=0.05&interval=0.001", headers=AUTH)
+        assert started.status_code == 202
+        assert client.post("/admin/profile", headers=AUTH).status_code == 409
+
+        deadline = time.monotonic() + 5
+        response = client.get("/admin/profile", headers=AUTH)
+        while response.status_code == 404 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            response = client.get("/admin/profile", headers=AUTH)
+        assert response.status_code == 200
+        assert response.headers["X-Profile-Pid"] == str(started.json["pid"])
+
+    def test_heap_diff(self, tmp_path):
+        """Test allocation growth is reported against the previous snapshot"""
+        client = self.client(tmp_path)
+
+        assert client.post("/admin/heap/start", headers=AUTH).json["tracing"] is True
+        retained = [bytearray(1024) for _ in range(1000)]
+        response = client.get("/admin/heap?top=5", headers=AUTH)
+
+        assert response.status_code == 200
+        assert response.json["compared_to_baseline"] is True
+        assert len(response.json["top"]) <= 5
+        assert any("test_admin.py" in site["site"] for site in response.json["top"])
+        assert client.post("/admin/heap/stop", headers=AUTH).json["tracing"] is False
+        del retained
+
+    def test_invalid_arguments(self, tmp_path):
+        """Test malformed query arguments are rejected"""
+        client = self.client(tmp_path)
+
+        assert client.post("/admin/profile?seconds=soon", headers=AUTH).status_code == 400
+        assert client.get("/admin/profile?pid=abc", headers=AUTH).status_code == 400
@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+from jitsi_slack_bolt.listeners.jitsi_command import jitsi_callback
+from jitsi_slack_bolt.util.admission import (
+    THROTTLED_REQUESTS,
+    AdmissionController,
+    parse_concurrency_limits,
+    set_admission_controller,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAdmissionController:
+    """Test per-team and per-user rate limits and per-subcommand concurrency limits"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.clock = FakeClock()
+        self.controller = AdmissionController(
+            team_rate=1,
+            team_burst=3,
+            user_rate=0.5,
+            user_burst=2,
+            max_concurrent={"dm": 1},
+            clock=self.clock,
+        )
+        set_admission_controller(self.controller)
+
+    def teardown_method(self):
+        """Remove the controller installed for the test"""
+        set_admission_controller(None)
+
+    def test_user_bucket_refills(self):
+        """Test a user is limited after their burst and admitted again once refilled"""
+        assert self.controller.check_rate("T1", "U1") is None
+        assert self.controller.check_rate("T1", "U1") is None
+        reason, message = self.controller.check_rate("T1", "U1")
+        assert reason == "user"
+        assert "try again in 2 seconds" in message
+
+        self.clock.now = 2.0
+
+        assert self.controller.check_rate("T1", "U1") is None
+
+    def test_team_limit_spans_users(self):
+        """Test the team bucket is shared by its users and a rejection charges neither bucket"""
+        for user_id in ("U1", "U2", "U3"):
+            assert self.controller.check_rate("T1", user_id) is None
+
+        assert self.controller.check_rate("T1", "U4")[0] == "team"
+        assert self.controller.check_rate("T2", "U4") is None
+        self.clock.now = 1.0
+        assert self.controller.check_rate("T1", "U1") is None
+        assert self.controller.check_rate("T1", "U4")[0] == "team"
+
+    def test_concurrency_limit(self):
+        """Test a subcommand over its concurrency limit is rejected until a slot frees up"""
+        self.controller.team_rate = self.controller.user_rate = 0
+        with self.controller.admit("T1", "U1", "dm") as first:
+            with self.controller.admit("T1", "U2", "dm") as second:
+                assert first is None
+                assert second.startswith("Too many of these requests")
+            with self.controller.admit("T1", "U2", "room") as other:
+                assert other is None
+
+        with self.controller.admit("T1", "U2", "dm") as after:
+            assert after is None
+
+    def test_rejection_costs_no_storage_or_slack_calls(self):
+        """Test a throttled command is answered from the ack without reaching the handlers"""
+        # Setup
+        ack, client, store = MagicMock(), MagicMock(), MagicMock()
+        command = {"team_id": "T1", "user_id": "U1", "text": "@user1 @user2"}
+        before = THROTTLED_REQUESTS.labels(reason="concurrency", subcommand="dm")._value.get()
+
+        # Action
+        with self.controller.admit("T1", "U2", "dm"):
+            jitsi_callback(ack, client, command, MagicMock(), MagicMock(), "/jitsi", store)
+
+        # Assert
+        assert ack.call_args.args[0].startswith("Too many of these requests")
+        assert client.mock_calls == []
+        assert store.mock_calls == []
+        assert THROTTLED_REQUESTS.labels(reason="concurrency", subcommand="dm")._value.get() == (
+            before + 1
+        )
+
+    def test_parse_concurrency_limits(self):
+        """Test parsing ADMISSION_CONCURRENCY"""
+        assert parse_concurrency_limits("dm=2, room=20") == {"dm": 2, "room": 20}
+        assert parse_concurrency_limits("") == {}
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent / "src" / "jitsi_slack_bolt"
+
+
+class TestImportTime:
+    """Test that optional dependencies are only imported when configured"""
+
+    def test_memory_oauth_app_skips_unused_providers(self, tmp_path):
+        """Test importing the app with the memory provider loads no other provider or adapter"""
+        # Setup
+        env = dict(
+            os.environ,
+            PYTHONPATH=os.pathsep.join(
+                filter(None, [str(APP_DIR.parent), os.environ.get("PYTHONPATH")])
+            ),
+            PROMETHEUS_MULTIPROC_DIR=str(tmp_path),
+            SLACK_EVENTS_API_MODE="oauth",
+            SLACK_SIGNING_SECRET="test",
+            SLACK_CLIENT_ID="test",
+            SLACK_CLIENT_SECRET="test",
+            STORAGE_PROVIDER="memory",
+        )
+
+        # Action
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app"],
+            cwd=APP_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+        # keep the -X importtime breakdown as a test artifact
+        artifact = Path(os.environ.get("IMPORTTIME_ARTIFACT", tmp_path / "importtime.txt"))
+        artifact.write_text(proc.stderr)
+
+        # Assert
+        assert proc.returncode == 0, proc.stderr
+        imported = {
+            line.rsplit("|", 1)[1].strip()
+            for line in proc.stderr.splitlines()
+            if line.startswith("import time:")
+        }
+        assert "app" in imported
+        for module in ("hvac", "sqlalchemy", "psycopg2", "slack_bolt.adapter.socket_mode"):
+            assert module not in imported, f"{module} imported with the memory provider"
@@ -147,3 +147,76 @@ class TestJitsiHandlers:
         # Assert
         self.respond.assert_called_once()
         assert "Invalid format" in self.respond.call_args[0][0]
+
+    def test_build_room_url_uses_channel_server(self, workspace_store, mock_command):
+        """Test rooms are created on the channel's server when it sets one"""
+        # Setup
+        workspace_store.set_workspace_server_url("T12345", "https://meet.team.com/")
+        workspace_store.set_channel_server_url("T12345", "C12345", "https://meet.channel.com/")
+
+        # Action
+        server_url, room_url = build_room_url(mock_command, workspace_store, room_str="standup")
+
+        # Assert
+        assert server_url == "https://meet.channel.com/"
+        assert room_url == "https://meet.channel.com/standup"
+
+    def test_slash_jitsi_server_channel(self, workspace_store, mock_command):
+        """Test setting, viewing and removing a channel's server"""
+        # Setup
+        command = mock_command.copy()
+        command["text"] = "server channel https://meet.channel.com"
+
+        # Action
+        slash_jitsi_server(command, self.logger, self.respond, workspace_store)
+        command["text"] = "server"
+        slash_jitsi_server(command, self.logger, self.respond, workspace_store)
+        command["text"] = "server channel default"
+        slash_jitsi_server(command, self.logger, self.respond, workspace_store)
+
+        # Assert
+        assert [call.args[0] for call in self.respond.call_args_list] == [
+            "This channel's conferences will be hosted at: https://meet.channel.com/",
+            "This channel's conferences are hosted at: https://meet.channel.com/",
+            "This channel's conference URL has been removed, conferences are hosted at: "
+            "https://meet.jit.si/",
+        ]
+
+    def test_slash_jitsi_server_org(self, workspace_store, mock_command):
+        """Test the organization's server applies to workspaces that do not set their own"""
+        # Setup
+        command = mock_command.copy()
+        command["text"] = "server org https://meet.org.com/"
+
+        # Action
+        slash_jitsi_server(command, self.logger, self.respond, workspace_store)
+        command["enterprise_id"] = "E12345"
+        slash_jitsi_server(command, self.logger, self.respond, workspace_store)
+        command["text"] = "server"
+        slash_jitsi_server(command, self.logger, self.respond, workspace_store)
+
+        # Assert
+        assert [call.args[0] for call in self.respond.call_args_list] == [
+            "This workspace is not part of an Enterprise Grid organization.",
+            "Your organization's conferences will be hosted at: https://meet.org.com/",
+            "Your organization's conferences are hosted at: https://meet.org.com/",
+        ]
+
+    def test_slash_jitsi_server_pool(self, workspace_store, mock_command):
+        """Test the /jitsi server command with several URLs sets a pool"""
+        # Setup
+        command = mock_command.copy()
+        command["text"] = "server https://meet1.example.com https://meet2.example.com/"
+
+        # Action
+        slash_jitsi_server(command, self.logger, self.respond, workspace_store)
+
+        # Assert
+        self.respond.assert_called_once_with(
+            "Your team's conferences will be hosted at: "
+            "https://meet1.example.com/, https://meet2.example.com/"
+        )
+        assert (
+            workspace_store.resolve_server_url(command["team_id"])
+            == "https://meet1.example.com/ https://meet2.example.com/"
+        )
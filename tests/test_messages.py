@@ -44,3 +44,15 @@ class TestMessages:
         # Check list of commands
         assert elements[1]["type"] == "rich_text_list"
         assert elements[1]["style"] == "bullet"
+
+    def test_build_help_message_blocks_is_memoized(self):
+        """Test the help message is rendered once per slash command and default server"""
+        first = build_help_message_blocks("/jitsi", "https://meet.jit.si/")
+        second = build_help_message_blocks("/jitsi", "https://meet.jit.si/")
+        other = build_help_message_blocks("/meet", "https://meet.jit.si/")
+
+        assert first is second
+        assert other is not first
+        assert other[0]["elements"][0]["elements"][0]["text"].startswith(
+            "Welcome to the /meet bot!"
+        )
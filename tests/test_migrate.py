@@ -0,0 +1,90 @@
+import json
+from jitsi_slack_bolt.migrate import JsonLinesStorageProvider, Migration, main
+from jitsi_slack_bolt.util.store import InMemoryStorageProvider, WorkspaceRecord
+
+
+class FailingTarget(JsonLinesStorageProvider):
+    """Target that fails to write a given page"""
+
+    def __init__(self, path, fail_on):
+        super().__init__(path)
+        self.fail_on = fail_on
+
+    def set_workspaces(self, records):
+        if records[0].workspace_id == self.fail_on:
+            raise ConnectionError("target is down")
+        super().set_workspaces(records)
+
+
+class TestMigration:
+    """Test copying workspace records between storage providers"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.source = InMemoryStorageProvider()
+        for i in range(25):
+            self.source.set_oauth(f"T{i:03}", f"xoxb-{i}")
+            if i % 2:
+                self.source.set_server_url(f"T{i:03}", f"https://meet{i}.example.com/")
+        self.source.set_server_url("default", "https://meet.jit.si/")
+
+    def test_round_trip_through_jsonl(self, tmp_path):
+        """Test records exported to a JSON lines file are imported unchanged"""
+        # Setup
+        path = str(tmp_path / "export.jsonl")
+        imported = InMemoryStorageProvider()
+
+        # Action
+        exported = Migration(self.source, JsonLinesStorageProvider(path), batch_size=4).run()
+        Migration(JsonLinesStorageProvider(path), imported, batch_size=7, workers=2).run()
+
+        # Assert
+        assert exported.copied == 26
+        assert imported.get_workspaces(["T001", "T002", "default"]) == [
+            WorkspaceRecord("T001", "xoxb-1", "https://meet1.example.com/"),
+            WorkspaceRecord("T002", "xoxb-2", None),
+            WorkspaceRecord("default", None, "https://meet.jit.si/"),
+        ]
+        assert Migration(self.source, imported).verify() == []
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Test an interrupted migration resumes after the last page it finished"""
+        # Setup
+        path = str(tmp_path / "target.jsonl")
+        checkpoint = str(tmp_path / "migrate.ckpt")
+        failing = FailingTarget(path, fail_on="T015")
+
+        # Action
+        try:
+            Migration(self.source, failing, batch_size=5, workers=1, checkpoint=checkpoint).run()
+        except ConnectionError:
+            pass
+        with open(checkpoint) as f:
+            saved = json.load(f)["after"]
+        resumed = Migration(
+            self.source, JsonLinesStorageProvider(path), batch_size=5, checkpoint=checkpoint
+        ).run()
+
+        # Assert
+        assert saved == "T014"
+        assert resumed.copied == 11
+        assert Migration(self.source, JsonLinesStorageProvider(path)).verify() == []
+
+    def test_verify_reports_differences(self):
+        """Test verification lists the keys whose records differ"""
+        target = InMemoryStorageProvider()
+        Migration(self.source, target).run()
+        target.set_server_url("T002", "https://other.example.com/")
+
+        assert Migration(self.source, target, batch_size=3).verify() == ["T002"]
+
+    def test_cli(self, tmp_path, monkeypatch, capsys):
+        """Test the command line copies between JSON lines files and verifies the copy"""
+        source, target = str(tmp_path / "source.jsonl"), str(tmp_path / "target.jsonl")
+        Migration(self.source, JsonLinesStorageProvider(source)).run()
+        monkeypatch.delenv("STORAGE_PROVIDER", raising=False)
+
+        status = main(["--source", source, "--target", target, "--verify"])
+
+        assert status == 0
+        assert "copied 26 records" in capsys.readouterr().out
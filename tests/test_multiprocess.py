@@ -0,0 +1,105 @@
+import os
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+from jitsi_slack_bolt.util.multiprocess import (
+    CompactingMultiProcessCollector,
+    MultiprocessCompactor,
+    compact,
+)
+
+
+def write_metrics(path, pid, requests, latency_bucket, peak):
+    """Write the files a worker with `pid` would leave in the multiprocess directory"""
+    counter = MmapedDict(os.path.join(path, f"counter_{pid}.db"))
+    counter.write_value(
+        mmap_key("requests", "requests_total", ["team"], ["T1"], "Requests"), requests, 0.0
+    )
+    counter.close()
+
+    histogram = MmapedDict(os.path.join(path, f"histogram_{pid}.db"))
+    histogram.write_value(
+        mmap_key("latency", "latency_bucket", ["le"], ["0.5"], "Latency"), latency_bucket, 0.0
+    )
+    histogram.write_value(
+        mmap_key("latency", "latency_bucket", ["le"], ["+Inf"], "Latency"), 1.0, 0.0
+    )
+    histogram.write_value(mmap_key("latency", "latency_sum", [], [], "Latency"), 0.25, 0.0)
+    histogram.close()
+
+    gauge = MmapedDict(os.path.join(path, f"gauge_max_{pid}.db"))
+    gauge.write_value(mmap_key("peak", "peak", [], [], "Peak"), peak, 0.0)
+    gauge.close()
+
+    gauge = MmapedDict(os.path.join(path, f"gauge_mostrecent_{pid}.db"))
+    gauge.write_value(mmap_key("last", "last", [], [], "Last"), peak, float(pid))
+    gauge.close()
+
+
+def scrape(path):
+    """Collect every sample as {(name, labels): value}"""
+    collector = CompactingMultiProcessCollector(None, path=str(path))
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for metric in collector.collect()
+        for sample in metric.samples
+        if not metric.name.startswith("jitsi_slack_metrics")
+    }
+
+
+class TestMultiprocessCompaction:
+    """Test compaction of exited workers' metric files"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.workers = {101: (3, 2, 7), 102: (5, 1, 9), 103: (11, 4, 2)}
+
+    def test_compaction_preserves_scraped_values(self, tmp_path):
+        """Test a scrape returns the same values before and after compaction"""
+        # Setup
+        for pid, values in self.workers.items():
+            write_metrics(str(tmp_path), pid, *values)
+        before = scrape(tmp_path)
+
+        # Action
+        removed = compact(str(tmp_path), [101, 102])
+
+        # Assert
+        assert removed == 8
+        assert scrape(tmp_path) == before
+        assert before[("requests_total", (("team", "T1"),))] == 19
+        assert before[("peak", ())] == 9
+        assert before[("last", ())] == 2
+        assert sorted(os.listdir(tmp_path)) == [
+            "counter_103.db",
+            "counter_aggregate.db",
+            "gauge_max_103.db",
+            "gauge_max_aggregate.db",
+            "gauge_mostrecent_103.db",
+            "gauge_mostrecent_aggregate.db",
+            "histogram_103.db",
+            "histogram_aggregate.db",
+        ]
+
+    def test_repeated_compaction_accumulates(self, tmp_path):
+        """Test later compactions fold into the existing aggregate"""
+        for pid, values in self.workers.items():
+            write_metrics(str(tmp_path), pid, *values)
+        before = scrape(tmp_path)
+
+        compact(str(tmp_path), [101])
+        compact(str(tmp_path), [102, 103])
+
+        assert scrape(tmp_path) == before
+        assert len(os.listdir(tmp_path)) == 4
+
+    def test_compactor_only_touches_exited_workers(self, tmp_path):
+        """Test the compactor merges the pids it was told about, once"""
+        for pid, values in self.workers.items():
+            write_metrics(str(tmp_path), pid, *values)
+        compactor = MultiprocessCompactor(str(tmp_path))
+
+        compactor.mark_dead(102)
+
+        assert compactor.run_once() == 4
+        assert compactor.run_once() == 0
+        assert os.path.exists(tmp_path / "counter_101.db")
+        assert not os.path.exists(tmp_path / "counter_102.db")
@@ -0,0 +1,119 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from jitsi_slack_bolt.listeners.jitsi_handlers import build_room_url
+from jitsi_slack_bolt.util.probe import (
+    SERVER_SELECTIONS,
+    ServerProber,
+    choose_server,
+    http_probe,
+    set_server_prober,
+)
+
+
+class StandInServer:
+    """Local HTTP server standing in for a Jitsi shard"""
+
+    def __init__(self, delay=0.0, status=200):
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(outer.delay)
+                self.send_response(outer.status)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.delay = delay
+        self.status = status
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.01,), daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def unused_url():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}/"
+
+
+class TestServerProber:
+    """Test health and latency based selection from server pools"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.fast = StandInServer()
+        self.slow = StandInServer(delay=0.2)
+        self.failing = StandInServer(status=503)
+        # the probe thread never wakes up during a test; rounds are run explicitly
+        self.prober = ServerProber(interval=3600, timeout=1.0)
+        self.prober._ensure_thread = lambda: None
+
+    def teardown_method(self):
+        """Stop the stand-in servers and remove the prober"""
+        set_server_prober(None)
+        for server in (self.fast, self.slow, self.failing):
+            server.close()
+
+    def test_http_probe(self):
+        """Test servers answering with a server error or not at all count as down"""
+        assert http_probe(self.fast.url, 1.0) is True
+        assert http_probe(self.failing.url, 1.0) is False
+        assert http_probe(unused_url(), 1.0) is False
+
+    def test_pool_uses_first_member_until_probed(self):
+        """Test an unprobed pool behaves like its first server"""
+        pool = (self.slow.url, self.fast.url)
+
+        assert self.prober.choose(pool) == self.slow.url
+
+    def test_chooses_fastest_healthy_member(self):
+        """Test the lowest latency server that is up is chosen after a probe round"""
+        # Setup
+        pool = (self.failing.url, unused_url(), self.slow.url, self.fast.url)
+        self.prober.choose(pool)
+        before = SERVER_SELECTIONS.labels(server=self.fast.url)._value.get()
+
+        # Action
+        self.prober.probe_once()
+
+        # Assert
+        assert self.prober.choose(pool) == self.fast.url
+        assert self.prober.ranking(pool)[:2] == (self.fast.url, self.slow.url)
+        assert self.prober.health()[self.failing.url]["up"] is False
+        assert SERVER_SELECTIONS.labels(server=self.fast.url)._value.get() == before + 1
+
+    def test_ranking_follows_latency_changes(self):
+        """Test a server that slows down loses its place in the ranking"""
+        pool = (self.fast.url, self.slow.url)
+        self.prober.choose(pool)
+        self.prober.probe_once()
+        assert self.prober.choose(pool) == self.fast.url
+
+        self.fast.delay, self.slow.delay = 0.4, 0.0
+        self.prober.smoothing = 1.0
+        self.prober.probe_once()
+
+        assert self.prober.choose(pool) == self.slow.url
+
+    def test_build_room_url_uses_pool(self, workspace_store, mock_command):
+        """Test rooms are created on the chosen member of the workspace's pool"""
+        # Setup
+        set_server_prober(self.prober)
+        workspace_store.set_workspace_server_url("T12345", f"{self.slow.url} {self.fast.url}")
+        choose_server(workspace_store.resolve_server_url("T12345"))
+        self.prober.probe_once()
+
+        # Action
+        server_url, room_url = build_room_url(mock_command, workspace_store, room_str="standup")
+
+        # Assert
+        assert server_url == self.fast.url
+        assert room_url == f"{self.fast.url}standup"
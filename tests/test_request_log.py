@@ -0,0 +1,99 @@
+import logging
+import pytest
+from unittest.mock import patch
+from jitsi_slack_bolt.util.request_log import (
+    LazyPayload,
+    RequestLogger,
+    parse_sample_rates,
+    redact,
+    start_queued_logging,
+)
+
+
+class TestRequestLog:
+    """Test lazy, sampled and redacted request logging"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.logger = logging.getLogger("test-request-log")
+        self.logger.setLevel(logging.DEBUG)
+        self.body = {
+            "token": "secret-token",
+            "team_id": "T12345",
+            "response_url": "https://hooks.slack.com/commands/T12345/1/abc",
+            "event": {"type": "app_mention", "token": "nested-secret"},
+        }
+
+    def test_redact_nested_fields(self):
+        """Test sensitive fields are replaced at every depth"""
+        redacted = redact(self.body, frozenset({"token", "response_url"}))
+
+        assert redacted["team_id"] == "T12345"
+        assert redacted["token"] == "[redacted]"
+        assert redacted["response_url"] == "[redacted]"
+        assert redacted["event"]["token"] == "[redacted]"
+        assert self.body["token"] == "secret-token"
+
+    def test_payload_is_not_formatted_when_debug_is_off(self):
+        """Test nothing is logged or formatted below DEBUG"""
+        self.logger.setLevel(logging.INFO)
+        request_log = RequestLogger(self.logger)
+
+        with patch.object(LazyPayload, "__str__") as formatted:
+            request_log.log("bolt", "received request", payload=self.body)
+
+        formatted.assert_not_called()
+
+    def test_logged_payload_is_redacted(self, caplog):
+        """Test emitted records contain the redacted payload"""
+        request_log = RequestLogger(self.logger)
+
+        with caplog.at_level(logging.DEBUG, logger="test-request-log"):
+            request_log.log("bolt", "received request", payload=self.body)
+
+        assert len(caplog.records) == 1
+        assert caplog.records[0].route == "bolt"
+        assert "T12345" in caplog.text
+        assert "secret-token" not in caplog.text
+        assert "nested-secret" not in caplog.text
+
+    def test_sampling_per_route(self, caplog):
+        """Test routes with a zero sample rate are never logged"""
+        request_log = RequestLogger(self.logger, sample_rates={"health": 0})
+
+        with caplog.at_level(logging.DEBUG, logger="test-request-log"):
+            for _ in range(10):
+                request_log.log("health", "health check")
+            request_log.log("slack_events", "received event %s", "<Request>")
+
+        assert [record.getMessage() for record in caplog.records] == [
+            "slack_events: received event <Request>"
+        ]
+
+    def test_parse_sample_rates(self):
+        """Test parsing the per-route sample rate setting"""
+        assert parse_sample_rates("slack_events=0.1, health=0") == {
+            "slack_events": 0.1,
+            "health": 0.0,
+        }
+        assert parse_sample_rates(None) == {}
+        with pytest.raises(ValueError):
+            parse_sample_rates("health")
+        with pytest.raises(ValueError):
+            parse_sample_rates("health=2")
+
+    def test_queued_logging_delivers_records(self):
+        """Test records reach the original handlers through the queue"""
+        logger = logging.getLogger("test-request-log-queued")
+        logger.propagate = False
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger.addHandler(handler)
+
+        listener = start_queued_logging(logger)
+        logger.warning("queued %s", "message")
+        listener.stop()
+
+        assert [record.getMessage() for record in records] == ["queued message"]
+        assert handler not in logger.handlers
@@ -0,0 +1,76 @@
+import time
+import pytest
+from jitsi_slack_bolt.util.resilience import CircuitBreaker, DeadlineExceeded, DeadlineExecutor
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Test the circuit breaker state machine"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.clock = FakeClock()
+        self.opened = []
+        self.breaker = CircuitBreaker(
+            failure_threshold=2,
+            reset_timeout=10,
+            on_open=lambda: self.opened.append(self.clock.now),
+            clock=self.clock,
+        )
+
+    def test_opens_after_threshold(self):
+        """Test the breaker opens after consecutive failures"""
+        self.breaker.record_failure()
+        assert self.breaker.allow_request()
+        self.breaker.record_failure()
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert not self.breaker.allow_request()
+        assert self.opened == [0.0]
+
+    def test_half_open_allows_single_trial(self):
+        """Test only one trial call is let through after the reset timeout"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+
+        assert self.breaker.state == CircuitBreaker.HALF_OPEN
+        assert self.breaker.allow_request()
+        assert not self.breaker.allow_request()
+
+        self.breaker.record_success()
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_trial_reopens(self):
+        """Test a failed trial call opens the breaker again"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 10
+        assert self.breaker.allow_request()
+
+        self.breaker.record_failure()
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert self.opened == [0.0, 10]
+
+
+class TestDeadlineExecutor:
+    """Test calls bounded by a deadline"""
+
+    def test_returns_result(self):
+        """Test a fast call returns its result"""
+        executor = DeadlineExecutor()
+        assert executor.call(lambda x: x * 2, 21, timeout=1) == 42
+
+    def test_raises_on_deadline(self):
+        """Test a slow call raises DeadlineExceeded"""
+        executor = DeadlineExecutor()
+        with pytest.raises(DeadlineExceeded):
+            executor.call(time.sleep, 0.5, timeout=0.01)
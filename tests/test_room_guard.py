@@ -0,0 +1,90 @@
+import pytest
+from jitsi_slack_bolt.util.room_guard import (
+    RoomNameGuard,
+    RotatingBloomFilter,
+    issue_room_name,
+    set_room_name_guard,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRotatingBloomFilter:
+    """Test the time-windowed Bloom filter"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.clock = FakeClock()
+        self.seen = RotatingBloomFilter(capacity=100, error_rate=0.01, window=10, clock=self.clock)
+
+    def test_remembers_added_items(self):
+        """Test added items are found and others mostly are not"""
+        self.seen.add("FirstRoom")
+
+        assert "FirstRoom" in self.seen
+        false_positives = sum(f"Room{i}" in self.seen for i in range(1000))
+        assert false_positives < 50
+
+    def test_forgets_items_after_window(self):
+        """Test items survive one rotation and are dropped after a full window"""
+        self.seen.add("FirstRoom")
+
+        self.clock.now = 6
+        assert "FirstRoom" in self.seen
+
+        self.clock.now = 11
+        assert "FirstRoom" not in self.seen
+
+    def test_invalid_parameters(self):
+        """Test the filter rejects impossible sizing"""
+        with pytest.raises(ValueError):
+            RotatingBloomFilter(capacity=0, error_rate=0.01, window=10)
+        with pytest.raises(ValueError):
+            RotatingBloomFilter(capacity=10, error_rate=1.5, window=10)
+
+
+class TestRoomNameGuard:
+    """Test room name deduplication per server"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.names = iter(["SameRoom", "SameRoom", "OtherRoom", "SameRoom"])
+        self.guard = RoomNameGuard(capacity=100, generate=lambda: next(self.names))
+
+    def teardown_method(self):
+        """Remove any guard installed by a test"""
+        set_room_name_guard(None)
+
+    def test_retries_on_collision(self):
+        """Test a name already issued on a server is replaced"""
+        assert self.guard.issue("https://meet.jit.si/") == "SameRoom"
+        assert self.guard.issue("https://meet.jit.si/") == "OtherRoom"
+
+        stats = self.guard.stats()
+        assert stats["issued"] == 2
+        assert stats["collisions"] == 1
+        assert stats["collision_rate"] == 0.5
+        assert stats["memory_bytes"] > 0
+
+    def test_servers_are_tracked_separately(self):
+        """Test the same name may be issued on different servers"""
+        assert self.guard.issue("https://meet.jit.si/") == "SameRoom"
+        assert self.guard.issue("https://meet.example.com/") == "SameRoom"
+        assert self.guard.stats()["servers"] == 2
+
+    def test_issue_room_name_uses_installed_guard(self):
+        """Test the module level helper goes through the installed guard"""
+        set_room_name_guard(self.guard)
+
+        issue_room_name("https://meet.jit.si/")
+        issue_room_name("https://meet.jit.si/")
+
+        assert self.guard.stats()["collisions"] == 1
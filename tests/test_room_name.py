@@ -1,5 +1,10 @@
 import pytest
-from jitsi_slack_bolt.util.room_name import generate_room_name
+from jitsi_slack_bolt.util.room_name import (
+    ADJECTIVES,
+    WordList,
+    generate_room_name,
+    generate_room_names,
+)
 
 
 class TestRoomNameGenerator:
@@ -21,3 +26,25 @@ class TestRoomNameGenerator:
 
         # Check that they're all unique
         assert len(set(room_names)) == 10, "Generated room names should be unique"
+
+    def test_generate_room_names_batch(self):
+        """Test that a batch of room names is generated from the word lists"""
+        # Generate a batch of room names
+        room_names = generate_room_names(50)
+
+        # Verify the batch size and that every name starts with a known adjective
+        assert len(room_names) == 50
+        assert all(any(name.startswith(adj) for adj in ADJECTIVES) for name in room_names)
+        assert generate_room_names(0) == []
+
+    def test_word_list_matches_words(self):
+        """Test that a packed word list behaves like the list it was built from"""
+        words = ["Alpha", "Be", "Gamma"]
+        word_list = WordList(words)
+
+        assert len(word_list) == 3
+        assert list(word_list) == words
+        assert word_list[1] == "Be"
+        assert word_list[-1] == "Gamma"
+        with pytest.raises(IndexError):
+            word_list[3]
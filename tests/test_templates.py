@@ -0,0 +1,66 @@
+import json
+import pytest
+from jitsi_slack_bolt.util.templates import BlockTemplate, Slot
+
+
+class TestBlockTemplate:
+    """Test the precompiled Block Kit templates"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.template = BlockTemplate(
+            [
+                {"type": "section", "text": {"type": "plain_text", "text": Slot("message")}},
+                {
+                    "type": "actions",
+                    "elements": [
+                        {
+                            "type": "button",
+                            "text": {"type": "plain_text", "text": "Join"},
+                            "url": Slot("room_url", kind="url"),
+                        },
+                        {"type": "button", "text": Slot("message", fmt="About {}")},
+                    ],
+                },
+            ]
+        )
+
+    def test_render_fills_slots(self):
+        """Test rendering substitutes every slot"""
+        blocks = self.template.render(message="Standup", room_url="https://meet.jit.si/Standup")
+
+        assert blocks[0]["text"]["text"] == "Standup"
+        assert blocks[1]["elements"][0]["url"] == "https://meet.jit.si/Standup"
+        assert blocks[1]["elements"][1]["text"] == "About Standup"
+
+    def test_render_shares_static_subtrees(self):
+        """Test static parts are reused while slot-bearing parts are rebuilt"""
+        first = self.template.render(message="One", room_url="https://meet.jit.si/One")
+        second = self.template.render(message="Two", room_url="https://meet.jit.si/Two")
+
+        assert first[1]["elements"][0]["text"] is second[1]["elements"][0]["text"]
+        assert first[0] is not second[0]
+        assert first[0]["text"]["text"] == "One"
+
+    def test_render_json_matches_render(self):
+        """Test the serialized form escapes slot values and matches the rendered blocks"""
+        message = 'Say "hi" \\ then </script>\n'
+        values = {"message": message, "room_url": "https://meet.jit.si/Room"}
+
+        serialized = self.template.render_json(**values)
+
+        assert json.loads(serialized) == self.template.render(**values)
+
+    def test_url_slot_rejects_non_urls(self):
+        """Test url slots only accept http(s) URLs"""
+        with pytest.raises(ValueError):
+            self.template.render(message="Standup", room_url="javascript:alert(1)")
+        with pytest.raises(ValueError):
+            self.template.render_json(message="Standup", room_url="meet.jit.si/Room")
+
+    def test_missing_slot(self):
+        """Test rendering without every slot fails"""
+        with pytest.raises(TypeError):
+            self.template.render(message="Standup")
+        with pytest.raises(TypeError):
+            self.template.render_json(message="Standup")
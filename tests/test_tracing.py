@@ -0,0 +1,177 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from jitsi_slack_bolt.listeners.jitsi_command import jitsi_callback
+from jitsi_slack_bolt.util.tracing import (
+    FileExporter,
+    TracedWebClient,
+    Tracer,
+    set_tracer,
+    span,
+    traced_callable,
+)
+
+
+class ListExporter:
+    """Exporter keeping every OTLP/JSON payload in memory"""
+
+    def __init__(self):
+        self.payloads = []
+
+    def export(self, payload):
+        self.payloads.append(payload)
+
+    @property
+    def spans(self):
+        return [
+            s
+            for payload in self.payloads
+            for resource in payload["resourceSpans"]
+            for scope in resource["scopeSpans"]
+            for s in scope["spans"]
+        ]
+
+
+class TestTracer:
+    """Test span recording, sampling and export"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.exporter = ListExporter()
+        self.tracer = Tracer(self.exporter)
+        set_tracer(self.tracer)
+
+    def teardown_method(self):
+        """Remove the tracer installed for the test"""
+        set_tracer(None)
+
+    def test_nested_spans_share_a_trace(self):
+        """Test child spans link to their parent and the trace is exported when the root ends"""
+        # Action
+        with span("root", team_id="T12345"):
+            with span("child"):
+                pass
+        self.tracer.flush()
+
+        # Assert
+        child, root = self.exporter.spans
+        assert root["name"] == "root"
+        assert "parentSpanId" not in root
+        assert child["parentSpanId"] == root["spanId"]
+        assert child["traceId"] == root["traceId"]
+        assert root["attributes"] == [{"key": "team_id", "value": {"stringValue": "T12345"}}]
+        assert int(root["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+
+    def test_exception_marks_span_as_error(self):
+        """Test a failing block is recorded with an error status and still raises"""
+        with pytest.raises(RuntimeError):
+            with span("failing"):
+                raise RuntimeError("boom")
+        self.tracer.flush()
+
+        assert self.exporter.spans[0]["status"] == {"code": 2, "message": "RuntimeError: boom"}
+
+    def test_unsampled_traces_are_not_recorded(self):
+        """Test a zero sample rate records nothing"""
+        set_tracer(Tracer(self.exporter, sample_rate=0))
+
+        with span("root") as root:
+            with span("child") as child:
+                pass
+
+        assert root is None
+        assert child is None
+        assert self.exporter.payloads == []
+
+    def test_children_of_unsampled_traces_are_not_sampled(self):
+        """Test the sampling decision of the root applies to the whole trace"""
+        tracer = Tracer(self.exporter, sample_rate=0.5)
+        set_tracer(tracer)
+
+        with patch("jitsi_slack_bolt.util.tracing.random.random", side_effect=[0.9, 0.1]):
+            with span("root") as root:
+                with span("child") as child:
+                    pass
+
+        assert root is None
+        assert child is None
+
+    def test_slow_traces_are_kept_when_not_sampled(self):
+        """Test traces slower than the threshold are exported regardless of sampling"""
+        tracer = Tracer(self.exporter, sample_rate=0, slow_threshold=0.0)
+        set_tracer(tracer)
+
+        with span("slow"):
+            pass
+        tracer.flush()
+
+        assert [s["name"] for s in self.exporter.spans] == ["slow"]
+
+    def test_disabled_tracing_is_a_no_op(self):
+        """Test span yields nothing when no tracer is installed"""
+        set_tracer(None)
+
+        with span("anything") as current:
+            assert current is None
+
+    def test_traced_client_and_respond(self):
+        """Test Slack API methods and respond are recorded as child spans"""
+        # Setup
+        client = TracedWebClient(MagicMock())
+        client._client.users_list.return_value = {"members": []}
+        respond = traced_callable("slack.respond", MagicMock())
+
+        # Action
+        with span("jitsi_callback"):
+            assert client.users_list() == {"members": []}
+            respond("hello")
+        self.tracer.flush()
+
+        # Assert
+        assert [s["name"] for s in self.exporter.spans] == [
+            "slack.users_list",
+            "slack.respond",
+            "jitsi_callback",
+        ]
+
+    def test_command_dispatch_and_storage_spans(self, workspace_store, mock_command):
+        """Test a command records its dispatch and storage reads in one trace"""
+        # Action
+        jitsi_callback(
+            MagicMock(),
+            MagicMock(),
+            mock_command,
+            MagicMock(),
+            MagicMock(),
+            "/jitsi",
+            workspace_store,
+        )
+        self.tracer.flush()
+
+        # Assert
+        root = self.exporter.spans[-1]
+        children = [
+            s["name"] for s in self.exporter.spans if s.get("parentSpanId") == root["spanId"]
+        ]
+        assert root["name"] == "jitsi_callback"
+        assert {"key": "subcommand", "value": {"stringValue": "room"}} in root["attributes"]
+        assert "storage.resolve_server_url" in children
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        """Test each export is appended as one line of OTLP/JSON"""
+        path = tmp_path / "traces.jsonl"
+        tracer = Tracer(FileExporter(str(path)))
+        set_tracer(tracer)
+
+        with span("first"):
+            pass
+        tracer.flush()
+        with span("second"):
+            pass
+        tracer.flush()
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == (
+            "second"
+        )
@@ -0,0 +1,77 @@
+import json
+from unittest.mock import MagicMock
+from jitsi_slack_bolt.listeners.jitsi_handlers import slash_jitsi
+from jitsi_slack_bolt.util.usage import (
+    USAGE_EVENTS_DROPPED,
+    FileUsageSink,
+    UsageEvent,
+    UsageRecorder,
+    set_usage_recorder,
+)
+
+
+class TestUsageRecorder:
+    """Test buffered usage events"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.sink = MagicMock()
+        # the writer thread never wakes up during a test; batches are flushed explicitly
+        self.recorder = UsageRecorder(
+            self.sink, max_queue_size=3, batch_size=2, flush_interval=3600
+        )
+        self.recorder._ensure_thread = lambda: None
+        set_usage_recorder(self.recorder)
+
+    def teardown_method(self):
+        """Remove the recorder installed for the test"""
+        set_usage_recorder(None)
+
+    def event(self, team_id="T1"):
+        return UsageEvent(team_id, "C1", "room", "https://meet.jit.si/", 1.0)
+
+    def test_room_creation_emits_event(self, workspace_store, mock_command, tmp_path):
+        """Test creating a room writes a usage event to the file sink once flushed"""
+        # Setup
+        path = tmp_path / "usage.jsonl"
+        self.recorder.sink = FileUsageSink(str(path))
+
+        # Action
+        slash_jitsi(mock_command, MagicMock(), MagicMock(), workspace_store)
+        self.recorder.flush()
+
+        # Assert
+        (line,) = path.read_text().splitlines()
+        event = json.loads(line)
+        assert event["team_id"] == "T12345"
+        assert event["channel_id"] == "C12345"
+        assert event["subcommand"] == "room"
+        assert event["server_url"] == "https://meet.jit.si/"
+
+    def test_events_are_written_in_batches(self):
+        """Test a flush writes the queue in batches of batch_size"""
+        for team_id in ("T1", "T2", "T3"):
+            self.recorder.record(self.event(team_id))
+
+        self.recorder.flush()
+
+        assert [len(call.args[0]) for call in self.sink.write.call_args_list] == [2, 1]
+
+    def test_full_queue_drops_events(self):
+        """Test events beyond the queue size are dropped and counted"""
+        before = USAGE_EVENTS_DROPPED.labels(reason="queue_full")._value.get()
+
+        for _ in range(5):
+            self.recorder.record(self.event())
+
+        assert USAGE_EVENTS_DROPPED.labels(reason="queue_full")._value.get() == before + 2
+
+    def test_failed_write_drops_batch(self):
+        """Test a batch the sink fails to write is counted as dropped"""
+        self.sink.write.side_effect = OSError("disk full")
+        before = USAGE_EVENTS_DROPPED.labels(reason="write_error")._value.get()
+        self.recorder.record(self.event())
+
+        self.recorder.flush()
+
+        assert USAGE_EVENTS_DROPPED.labels(reason="write_error")._value.get() == before + 1
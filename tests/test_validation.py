@@ -0,0 +1,136 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+from jitsi_slack_bolt.listeners.jitsi_handlers import slash_jitsi_server
+from jitsi_slack_bolt.util.validation import ServerValidator, check_server, set_server_validator
+
+
+class NotFoundHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/" else 404)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCheckServer:
+    """Test the reachability check of a single server"""
+
+    def setup_method(self):
+        """Start a local HTTP server standing in for Jitsi"""
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), NotFoundHandler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.01,), daemon=True).start()
+
+    def teardown_method(self):
+        """Stop the local HTTP server"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_reachable_server(self):
+        """Test a server answering the URL passes"""
+        assert check_server(self.url, 1.0) is None
+
+    def test_http_error(self):
+        """Test a URL answered with an HTTP error fails"""
+        assert check_server(f"{self.url}typo/", 1.0).endswith("answered with HTTP 404")
+
+    def test_closed_port(self):
+        """Test a server that does not accept connections fails"""
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            url = f"http://127.0.0.1:{s.getsockname()[1]}/"
+
+        assert check_server(url, 1.0).endswith("did not answer")
+
+
+class TestServerValidation:
+    """Test background validation of /jitsi server URLs"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.checked = []
+        self.release = threading.Event()
+        self.release.set()
+        self.validator = ServerValidator(timeout=1.0, check=self.check)
+        self.respond = MagicMock()
+        set_server_validator(self.validator)
+
+    def teardown_method(self):
+        """Remove the validator installed for the test"""
+        set_server_validator(None)
+
+    def check(self, server_url, timeout):
+        self.checked.append(server_url)
+        self.release.wait()
+        return None if "good" in server_url else "bad.example.com could not be resolved"
+
+    def wait_for_responses(self, count):
+        deadline = time.monotonic() + 5
+        while self.respond.call_count < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_valid_server_is_saved_after_check(self, workspace_store, mock_command):
+        """Test the command answers at once and saves the server once it has been checked"""
+        # Setup
+        command = mock_command.copy()
+        command["text"] = "server https://good.example.com/"
+        self.release.clear()
+
+        # Action
+        slash_jitsi_server(command, MagicMock(), self.respond, workspace_store)
+        saved_before_check = workspace_store.resolve_server_url("T12345")
+        self.release.set()
+        self.wait_for_responses(2)
+
+        # Assert
+        assert saved_before_check == "https://meet.jit.si/"
+        assert [call.args[0] for call in self.respond.call_args_list] == [
+            "Checking that https://good.example.com/ is reachable...",
+            "Your team's conferences will be hosted at: https://good.example.com/",
+        ]
+        assert workspace_store.resolve_server_url("T12345") == "https://good.example.com/"
+
+    def test_unreachable_server_is_not_saved(self, workspace_store, mock_command):
+        """Test a server failing the check leaves the setting unchanged"""
+        command = mock_command.copy()
+        command["text"] = "server channel https://good.example.com/ https://bad.example.com/"
+
+        slash_jitsi_server(command, MagicMock(), self.respond, workspace_store)
+        self.wait_for_responses(2)
+
+        assert self.respond.call_args.args[0] == (
+            "The conference server was not changed: bad.example.com could not be resolved."
+        )
+        assert workspace_store.resolve("T12345", "C12345").level == "default"
+
+    def test_results_are_cached_per_host(self, workspace_store, mock_command):
+        """Test a host checked recently is answered from the cache without a background check"""
+        # Setup
+        self.validator.validate("https://good.example.com/")
+        command = mock_command.copy()
+        command["text"] = "server https://good.example.com/tenant"
+
+        # Action
+        slash_jitsi_server(command, MagicMock(), self.respond, workspace_store)
+
+        # Assert
+        self.respond.assert_called_once_with(
+            "Your team's conferences will be hosted at: https://good.example.com/tenant/"
+        )
+        assert self.checked == ["https://good.example.com/"]
+
+    def test_check_is_bounded_by_timeout(self):
+        """Test a check that hangs fails after the timeout"""
+        self.release.clear()
+        self.validator.timeout = 0.05
+
+        try:
+            assert self.validator.validate("https://good.example.com/").endswith(
+                "did not answer within 0.05s"
+            )
+        finally:
+            self.release.set()
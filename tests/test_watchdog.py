@@ -0,0 +1,115 @@
+import threading
+from flask import Flask
+from jitsi_slack_bolt.admin import create_admin_blueprint
+from jitsi_slack_bolt.util.watchdog import (
+    SLOW_REQUESTS,
+    SlowRequestWatchdog,
+    set_watchdog,
+    watch_request,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_in_storage(started, release):
+    started.set()
+    release.wait()
+
+
+class TestSlowRequestWatchdog:
+    """Test slow request capture"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.clock = FakeClock()
+        # the monitor thread never wakes up during a test; samples are taken explicitly
+        self.watchdog = SlowRequestWatchdog(
+            threshold=1.5, capacity=2, check_interval=3600, clock=self.clock
+        )
+        set_watchdog(self.watchdog)
+
+    def teardown_method(self):
+        """Remove the watchdog installed for the test"""
+        set_watchdog(None)
+
+    def test_fast_requests_are_not_recorded(self, workspace_store):
+        """Test requests under the threshold leave no record"""
+        with watch_request("jitsi_callback", subcommand="room"):
+            workspace_store.get_workspace_server_url("T12345")
+            self.clock.now = 1.0
+
+        assert self.watchdog.recent() == []
+
+    def test_slow_request_records_attributes_and_stages(self, workspace_store):
+        """Test a slow request is recorded with its attributes and storage stages"""
+        # Setup
+        before = SLOW_REQUESTS.labels(subcommand="room")._value.get()
+
+        # Action
+        with watch_request("jitsi_callback", team_id="T12345", subcommand="room"):
+            workspace_store.get_workspace_server_url("T12345")
+            self.clock.now = 2.0
+
+        # Assert
+        (slow,) = self.watchdog.recent()
+        assert slow["elapsed"] == 2.0
+        assert slow["attributes"] == {"team_id": "T12345", "subcommand": "room"}
+        assert [stage["name"] for stage in slow["stages"]] == ["storage.get_workspace_server_url"]
+        assert SLOW_REQUESTS.labels(subcommand="room")._value.get() == before + 1
+
+    def test_ring_buffer_keeps_most_recent(self):
+        """Test only `capacity` slow requests are kept, newest first"""
+        for team_id in ("T1", "T2", "T3"):
+            with watch_request("jitsi_callback", team_id=team_id):
+                self.clock.now += 2
+
+        assert [slow["attributes"]["team_id"] for slow in self.watchdog.recent()] == ["T3", "T2"]
+
+    def test_samples_stack_of_slow_request(self):
+        """Test the handling thread's stack is sampled while the request is slow"""
+        # Setup
+        started, release = threading.Event(), threading.Event()
+
+        def handle():
+            with watch_request("jitsi_callback", subcommand="dm"):
+                wait_in_storage(started, release)
+
+        handler = threading.Thread(target=handle, name="handler")
+        handler.start()
+        started.wait()
+
+        # Action
+        self.watchdog.sample()
+        self.clock.now = 2.0
+        self.watchdog.sample()
+        release.set()
+        handler.join()
+
+        # Assert
+        (slow,) = self.watchdog.recent()
+        (sampled,) = slow["stacks"]
+        assert sampled["samples"] == 1
+        assert sampled["stack"].startswith("handler;")
+        assert "wait_in_storage (test_watchdog.py:" in sampled["stack"]
+
+    def test_admin_endpoint(self):
+        """Test recorded slow requests are served on the admin endpoints"""
+        app = Flask(__name__)
+        app.register_blueprint(create_admin_blueprint("admin-secret", "/nonexistent"))
+        with watch_request("jitsi_callback", subcommand="help"):
+            self.clock.now = 3.0
+
+        response = app.test_client().get(
+            "/admin/slow", headers={"Authorization": "Bearer admin-secret"}
+        )
+
+        assert response.status_code == 200
+        assert response.json["requests"][0]["attributes"] == {"subcommand": "help"}
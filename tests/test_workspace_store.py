@@ -1,4 +1,8 @@
+import threading
+import time
 import pytest
+from unittest.mock import MagicMock
+from jitsi_slack_bolt.util.resilience import CircuitBreaker
 from jitsi_slack_bolt.util.store import WorkspaceStore, InMemoryStorageProvider
 
 
@@ -63,3 +67,164 @@ class TestWorkspaceStore:
         # Assert
         assert self.store.get_workspace_oauth(workspace_id) is None
         assert self.store.get_workspace_server_url(workspace_id) != "https://meet.example.com/"
+
+
+class CountingStorageProvider(InMemoryStorageProvider):
+    """In-memory provider that counts server URL reads"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    def get_server_urls(self, workspace_ids):
+        self.reads += 1
+        return super().get_server_urls(workspace_ids)
+
+
+class TestServerUrlResolution:
+    """Test channel, team, organization and default server URL resolution"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.provider = CountingStorageProvider()
+        self.store = WorkspaceStore(self.provider, default_server_url="https://meet.fallback.com/")
+        self.store.set_workspace_server_url("default", "https://meet.default.com/")
+
+    def test_most_specific_level_wins(self):
+        """Test a channel override beats the team, which beats the organization"""
+        # Setup
+        self.store.set_enterprise_server_url("E1", "https://meet.org.com")
+        assert self.store.resolve("T1", "C1", "E1") == ("https://meet.org.com/", "enterprise")
+        self.store.set_workspace_server_url("T1", "https://meet.team.com/")
+        assert self.store.resolve("T1", "C1", "E1") == ("https://meet.team.com/", "team")
+
+        # Action
+        self.store.set_channel_server_url("T1", "C1", "https://meet.channel.com/")
+
+        # Assert
+        assert self.store.resolve("T1", "C1", "E1") == ("https://meet.channel.com/", "channel")
+        assert self.store.resolve_server_url("T1", "C2", "E1") == "https://meet.team.com/"
+        assert self.store.resolve("T2", "C1") == ("https://meet.default.com/", "default")
+
+    def test_resolution_is_memoized(self):
+        """Test repeated lookups are answered without reading the provider"""
+        self.store.resolve("T1", "C1", "E1")
+        self.store.resolve("T1", "C1", "E1")
+        self.store.resolve("T1", "C1", "E1")
+
+        assert self.provider.reads == 1
+
+    def test_change_invalidates_only_dependent_resolutions(self):
+        """Test a change drops the memoized values resolved from that key only"""
+        # Setup
+        self.store.set_workspace_server_url("T1", "https://meet.team.com/")
+        self.store.resolve("T1", "C1")
+        self.store.resolve("T2", "C1")
+
+        # Action
+        self.store.set_workspace_server_url("T2", "https://meet.other.com/")
+
+        # Assert
+        assert self.store.resolve_server_url("T2", "C1") == "https://meet.other.com/"
+        assert self.store.resolve_server_url("T1", "C1") == "https://meet.team.com/"
+        assert self.provider.reads == 3
+
+    def test_removing_override_falls_back(self):
+        """Test deleting a channel or organization override uses the next level"""
+        self.store.set_channel_server_url("T1", "C1", "https://meet.channel.com/")
+        self.store.set_enterprise_server_url("E1", "https://meet.org.com/")
+        assert self.store.resolve("T1", "C1", "E1").level == "channel"
+
+        self.store.delete_channel_server_url("T1", "C1")
+        assert self.store.resolve("T1", "C1", "E1").level == "enterprise"
+        self.store.delete_enterprise_server_url("E1")
+        assert self.store.resolve("T1", "C1", "E1").level == "default"
+
+    def test_expired_resolution_is_read_again(self):
+        """Test memoized values are reread once the TTL has passed"""
+        now = [0.0]
+        store = WorkspaceStore(self.provider, resolved_ttl=30, clock=lambda: now[0])
+        store.resolve("T1")
+        self.provider.set_server_url("T1", "https://meet.elsewhere.com/")
+
+        assert store.resolve_server_url("T1") == "https://meet.default.com/"
+        now[0] = 31
+        assert store.resolve_server_url("T1") == "https://meet.elsewhere.com/"
+
+    def test_degraded_read_uses_expired_resolution(self):
+        """Test a failed read is answered from the last resolution rather than memoized"""
+        now = [0.0]
+        store = WorkspaceStore(
+            self.provider, read_timeout=0.05, resolved_ttl=30, clock=lambda: now[0]
+        )
+        store.set_workspace_server_url("T1", "https://meet.team.com/")
+        store.resolve("T1")
+        now[0] = 31
+        self.provider.get_server_urls = MagicMock(side_effect=RuntimeError("down"))
+
+        assert store.resolve("T1") == ("https://meet.team.com/", "team")
+        assert store.resolve("T2") == (None, "default")
+
+
+class SlowStorageProvider(InMemoryStorageProvider):
+    """In-memory provider whose reads can be made to stall"""
+
+    def __init__(self):
+        super().__init__()
+        self.stalled = threading.Event()
+
+    def get_server_url(self, workspace_id):
+        if self.stalled.is_set():
+            time.sleep(0.5)
+        return super().get_server_url(workspace_id)
+
+
+class TestWorkspaceStoreDeadline:
+    """Test degraded reads when the storage provider stalls"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.provider = SlowStorageProvider()
+        self.store = WorkspaceStore(
+            self.provider,
+            default_server_url="https://meet.fallback.com/",
+            read_timeout=0.05,
+            breaker_failure_threshold=2,
+            breaker_reset_timeout=60,
+        )
+
+    def test_stalled_read_uses_last_known_value(self):
+        """Test a timed out read is answered with the last value seen"""
+        self.store.set_workspace_server_url("test_team", "https://meet.example.com/")
+        assert self.store.get_workspace_server_url("test_team") == "https://meet.example.com/"
+
+        self.provider.stalled.set()
+        start = time.monotonic()
+        assert self.store.get_workspace_server_url("test_team") == "https://meet.example.com/"
+        assert time.monotonic() - start < 0.4
+
+    def test_stalled_read_without_cache_uses_default_server(self):
+        """Test a timed out read with nothing cached falls back to the configured default"""
+        self.provider.stalled.set()
+        assert self.store.get_workspace_server_url("other_team") == "https://meet.fallback.com/"
+
+    def test_breaker_opens_after_repeated_failures(self):
+        """Test the provider is no longer called once the breaker is open"""
+        self.provider.stalled.set()
+        self.store.get_workspace_server_url("test_team")
+        self.store.get_workspace_server_url("test_team")
+        assert self.store._breaker.state == CircuitBreaker.OPEN
+
+        self.provider.get_server_url = MagicMock()
+        assert self.store.get_workspace_server_url("test_team") == "https://meet.fallback.com/"
+        self.provider.get_server_url.assert_not_called()
+
+    def test_reset_after_fork_resets_provider(self):
+        """Test resetting after a fork reaches the storage provider"""
+        self.provider.reset_after_fork = MagicMock()
+
+        self.store.reset_after_fork()
+
+        self.provider.reset_after_fork.assert_called_once()
+        self.store.set_workspace_server_url("test_team", "https://meet.example.com/")
+        assert self.store.get_workspace_server_url("test_team") == "https://meet.example.com/"